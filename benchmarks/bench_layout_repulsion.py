@@ -0,0 +1,64 @@
+"""
+Micro-benchmark for the exact repulsion threshold of network.force_layout.
+
+Lays out synthetic donor-project graphs around the threshold with exact and with sampled
+repulsion, and reports the time and a layout quality measure: the mean edge length over the
+mean distance between random node pairs (lower means neighbours sit closer together relative
+to the whole layout). Run from the repository root:
+
+    python benchmarks/bench_layout_repulsion.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import network
+
+SIZES = [  # (donors, projects, donations)
+    (400, 60, 700),
+    (900, 100, 1500),
+    (1800, 150, 3000),
+    (2700, 200, 4500),
+]
+THRESHOLDS = [500, 3000]
+
+
+def make_graph(donors, projects, donations, seed=0):
+    """Bipartite donor-project edges with a few popular projects, as in real rounds."""
+    rng = np.random.default_rng(seed)
+    donor = rng.integers(0, donors, donations)
+    project = rng.zipf(1.6, donations) % projects
+    return network.bipartite_edges([f'd{i}' for i in donor], [f'p{i}' for i in project])
+
+
+def edge_length_ratio(pos, src, dst, seed=0):
+    rng = np.random.default_rng(seed)
+    pairs = rng.integers(0, len(pos), (20000, 2))
+    edges = np.linalg.norm(pos[src] - pos[dst], axis=1).mean()
+    return edges / np.linalg.norm(pos[pairs[:, 0]] - pos[pairs[:, 1]], axis=1).mean()
+
+
+def main():
+    default = network.exact_repulsion_max_nodes
+    print(f"{'nodes':>6} {'edges':>6} {'threshold':>10} {'repulsion':>10} {'seconds':>8} {'edge ratio':>11}")
+    try:
+        for donors, projects, donations in SIZES:
+            node_names, src, dst = make_graph(donors, projects, donations)
+            for threshold in THRESHOLDS:
+                network.exact_repulsion_max_nodes = threshold
+                start = time.perf_counter()
+                pos = network.force_layout(src, dst, len(node_names), k=.09, iterations=50)
+                seconds = time.perf_counter() - start
+                repulsion = 'exact' if len(node_names) <= threshold else 'sampled'
+                print(f"{len(node_names):>6} {len(src):>6} {threshold:>10} {repulsion:>10} {seconds:>8.3f} "
+                      f"{edge_length_ratio(pos, src, dst):>11.3f}")
+    finally:
+        network.exact_repulsion_max_nodes = default
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Micro-benchmark for utils.generate_round_summary.
+
+Times the summary on synthetic programs from a handful of rounds up to 100+ rounds
+over thousands of hours. Run from the repository root:
+
+    python benchmarks/bench_round_summary.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# utils reads the database settings at import time; the benchmark never connects
+for prefix in ('GRANTS', 'INDEXER'):
+    for setting in ('HOST', 'PORT', 'NAME', 'USERNAME', 'PASSWORD'):
+        os.environ.setdefault(f'{prefix}_DB_{setting}', '')
+
+import utils
+from benchmarks.synthetic import make_program
+
+SIZES = [  # (rounds, projects per round, hours)
+    (5, 30, 336),
+    (25, 50, 336),
+    (100, 50, 1000),
+    (150, 60, 3000),
+]
+
+
+def time_call(func, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    # Call the undecorated function so st.cache_data doesn't turn repeats into cache hits
+    generate_round_summary = utils.generate_round_summary.__wrapped__
+    print(f"{'rounds':>7} {'projects':>9} {'hours':>6} {'hourly rows':>12} {'seconds':>9}")
+    for rounds, projects_per_round, hours in SIZES:
+        dfp, dfr, hourly_contributions = make_program(rounds, projects_per_round, hours)
+        seconds = time_call(generate_round_summary, hourly_contributions, dfp, dfr)
+        print(f"{rounds:>7} {len(dfp):>9} {hours:>6} {len(hourly_contributions):>12} {seconds:>9.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,280 @@
+"""
+Load test: concurrent simulated visitors on the Home, Leaderboard and Networks pages.
+
+Each simulated session opens a page picked from the visit mix, then makes a few interactions
+(program switches, round selects, slider moves, color toggles), waiting a random think time
+between reruns. Sessions run the real page scripts with Streamlit's AppTest. By default they
+all run in threads of one process and share its result cache, query coalescing and connection
+pools, as the sessions of one server do. AppTest is not thread-safe and occasionally fails
+inside its own bookkeeping; those reruns are counted as harness errors, and the run fails when
+they exceed --max-harness-error-rate. --processes spreads the sessions over more processes,
+each with its own caches and pools: fewer harness errors, but every process loads the data
+itself, so latencies and memory are not those of one server. Results report throughput,
+p50/p95/p99 rerun latency per page and interaction, errors, and the peak RSS of the processes.
+
+Seed a local Postgres first (see seed_db.py), then run from the repository root, pinned to
+as many CPUs as the fly.io VM has (fly.toml):
+
+    taskset -c 0,1 python benchmarks/load_test.py --sessions 20 --duration 120
+    python benchmarks/load_test.py --sessions 50 --mix home=6,leaderboard=2,networks=2
+
+The cache warm-up (warmup.py) is off unless CACHE_WARMUP is set, so the first minute or so
+includes cold caches; use --warmup to leave it out of the statistics.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+os.chdir(root_dir)  # the pages read queries/ and assets/ relative to the working directory
+os.environ.setdefault('PERF_LOG', '0')
+os.environ.setdefault('CACHE_WARMUP', '0')  # sessions start on cold caches; the warm-up would also run once per process
+
+from streamlit.testing.v1 import AppTest
+
+results_dir = os.path.join(root_dir, 'benchmarks', 'results')
+rerun_timeout = 300  # seconds before a single rerun counts as failed
+startup_timeout = 120  # seconds for the worker processes to start
+
+PAGES = {  # name -> (script, interactions available on the page)
+    'home': ('Home.py', ['program switch', 'round select']),
+    'leaderboard': ('pages/🏆_Leaderboard.py', ['program switch']),
+    'networks': ('pages/🕸 _Networks.py', ['program switch', 'round select', 'slider move', 'color toggle']),
+}
+default_mix = 'home=5,leaderboard=2,networks=3'
+
+
+def _widget(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    return None
+
+
+def _pick_other(rng, options, current):
+    others = [o for o in options if o != current]
+    return rng.choice(others) if others else None
+
+
+def interact(at, action, rng):
+    """Change the widget behind `action` on the page `at`; returns False if the page doesn't show it."""
+    if action in ('program switch', 'round select'):
+        widget = _widget(at.selectbox, 'Select Program' if action == 'program switch' else 'Select Round')
+        if widget is None:
+            return False
+        choice = _pick_other(rng, widget.options, widget.value)
+        if choice is None:
+            return False
+        widget.set_value(choice)
+    elif action == 'slider move':
+        widget = _widget(at.slider, 'Minimum donation amount')
+        if widget is None:
+            return False
+        widget.set_value(rng.randint(widget.min, widget.max))
+    elif action == 'color toggle':
+        widget = _widget(at.checkbox, 'Toggle colors')
+        if widget is None:
+            return False
+        widget.set_value(not widget.value)
+    return True
+
+
+class Recorder:
+    """Thread-safe list of rerun timings."""
+
+    def __init__(self):
+        self.reruns = []
+        self._lock = threading.Lock()
+
+    def add(self, **fields):
+        with self._lock:
+            self.reruns.append(fields)
+
+
+def timed_run(at, recorder, session, page, action):
+    """Rerun the page and record it; returns False if the visit can't go on."""
+    started, start = time.time(), time.perf_counter()
+    error = None
+    try:
+        at.run(timeout=rerun_timeout)
+        if at.exception:
+            error = at.exception[0].message
+    except Exception as e:
+        if isinstance(e, RuntimeError) and str(e).startswith('AppTest script run timed out'):
+            error = str(e)
+        else:
+            # Script errors are reported through at.exception, so this failed inside AppTest itself,
+            # e.g. its widget bookkeeping racing another session's thread
+            recorder.add(session=session, page=page, action=action, started=started, seconds=None,
+                         error=None, harness_error=f'{type(e).__name__}: {e}')
+            return False
+    recorder.add(session=session, page=page, action=action, started=started,
+                 seconds=time.perf_counter() - start, error=error, harness_error=None)
+    return error is None
+
+
+def run_session(session, mix, interactions, think_time, deadline, recorder, seed):
+    """One visitor: open pages from the mix and interact with them until the deadline."""
+    rng = random.Random(seed)
+    pages, weights = zip(*mix.items())
+
+    def think():
+        time.sleep(rng.expovariate(1 / think_time) if think_time > 0 else 0)
+
+    while time.time() < deadline:
+        page = rng.choices(pages, weights)[0]
+        script, actions = PAGES[page]
+        at = AppTest.from_file(os.path.join(root_dir, script), default_timeout=rerun_timeout)
+        if not timed_run(at, recorder, session, page, 'open'):
+            think()  # don't spin against a failing page
+            continue
+        for _ in range(interactions):
+            think()
+            if time.time() >= deadline:
+                return
+            action = rng.choice(actions)
+            if interact(at, action, rng) and not timed_run(at, recorder, session, page, action):
+                break
+
+
+def run_process(sessions, settings, barrier, results):
+    """
+    Worker process: run `sessions` (list of session numbers) in threads until the deadline,
+    then put (reruns, peak RSS in MB) on the `results` queue.
+    """
+    barrier.wait(startup_timeout)  # start together once every process has imported Streamlit
+    recorder = Recorder()
+    deadline = time.time() + settings['warmup'] + settings['duration']
+    threads = [threading.Thread(target=run_session, name=f'session-{i}', daemon=True,
+                                args=(i, settings['mix'], settings['interactions'], settings['think_time'],
+                                      deadline, recorder, settings['seed'] + i))
+               for i in sessions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.put((recorder.reruns, peak_rss_mb()))
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024  # bytes on macOS, KB on Linux
+
+
+def summarize(reruns, elapsed):
+    """Per page and interaction: count, errors, reruns per second and latency percentiles in ms."""
+    df = pd.DataFrame(reruns, columns=['session', 'page', 'action', 'started', 'seconds', 'error', 'harness_error'])
+    groups = [('all', 'all', df)] + [(page, action, group) for (page, action), group in df.groupby(['page', 'action'])]
+    rows = []
+    for page, action, group in groups:
+        ok = group[group['error'].isna()]['seconds'] * 1000
+        rows.append({
+            'page': page,
+            'action': action,
+            'reruns': len(group),
+            'errors': int(group['error'].notna().sum()),
+            'per_second': round(len(group) / elapsed, 2) if elapsed else 0.0,
+            'p50_ms': round(float(np.percentile(ok, 50)), 1) if len(ok) else None,
+            'p95_ms': round(float(np.percentile(ok, 95)), 1) if len(ok) else None,
+            'p99_ms': round(float(np.percentile(ok, 99)), 1) if len(ok) else None,
+            'max_ms': round(float(ok.max()), 1) if len(ok) else None,
+        })
+    return pd.DataFrame(rows)
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        page, _, weight = part.partition('=')
+        if page.strip() not in PAGES:
+            raise argparse.ArgumentTypeError(f"Unknown page '{page}'; choose from {', '.join(PAGES)}")
+        mix[page.strip()] = float(weight or 1)
+    return mix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Concurrent-session load test of the Streamlit pages.')
+    parser.add_argument('--sessions', type=int, default=10, help='Concurrent simulated visitors')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='Processes to spread the sessions over (default 1, sharing caches like one server)')
+    parser.add_argument('--duration', type=float, default=60, help='Seconds to keep the sessions running')
+    parser.add_argument('--warmup', type=float, default=0, help='Leading seconds left out of the statistics')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(default_mix),
+                        help=f'Relative weights of page visits (default {default_mix})')
+    parser.add_argument('--interactions', type=int, default=3, help='Interactions per page visit')
+    parser.add_argument('--think-time', type=float, default=2.0, help='Mean seconds between interactions')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-harness-error-rate', type=float, default=0.02,
+                        help='Fail the run when more than this share of reruns fail inside AppTest (default 0.02)')
+    args = parser.parse_args(argv)
+    processes = max(1, min(args.processes, args.sessions))
+
+    # Spawned, not forked: Streamlit's threads and locks don't survive a fork
+    ctx = multiprocessing.get_context('spawn')
+    barrier = ctx.Barrier(processes + 1)
+    results = ctx.Queue()
+    settings = {name: getattr(args, name) for name in ('mix', 'interactions', 'think_time', 'seed', 'warmup', 'duration')}
+    workers = [ctx.Process(target=run_process, name=f'load-test-{p}', daemon=True,
+                           args=(list(range(p, args.sessions, processes)), settings, barrier, results))
+               for p in range(processes)]
+    for worker in workers:
+        worker.start()
+    barrier.wait(startup_timeout)
+    start = time.time()
+    reruns, peak_rss = [], []
+    for _ in workers:
+        worker_reruns, worker_rss = results.get(timeout=args.warmup + args.duration + rerun_timeout + startup_timeout)
+        reruns.extend(worker_reruns)
+        peak_rss.append(worker_rss)
+    elapsed = time.time() - start - args.warmup  # sessions finish the rerun in progress at the deadline
+    for worker in workers:
+        worker.join()
+
+    measured = [r for r in reruns if r['started'] >= start + args.warmup]
+    harness_errors = [r for r in measured if r['harness_error']]
+    measured = [r for r in measured if not r['harness_error']]
+    harness_error_rate = len(harness_errors) / (len(measured) + len(harness_errors)) if measured or harness_errors else 0.0
+    summary = summarize(measured, elapsed)
+    print(summary.to_string(index=False))
+    print(f"\n{args.sessions} sessions in {processes} processes for {elapsed:.0f}s: {len(measured)} reruns, "
+          f"{len(measured) / elapsed:.2f} reruns/s, peak RSS {max(peak_rss):.0f} MB per process, {sum(peak_rss):.0f} MB in total")
+    if processes > 1:
+        print(f"Each of the {processes} processes has its own caches and pools, so these numbers are not "
+              f"representative of one server; run with --processes 1 for those")
+    if harness_errors:
+        print(f"{len(harness_errors)} reruns ({harness_error_rate:.1%}) failed inside AppTest and were left out "
+              f"of the statistics (see harness_errors in the results)")
+
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, 'load-' + datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ') + '.json')
+    with open(path, 'w') as f:
+        json.dump({
+            'settings': {**vars(args), 'processes': processes, 'cpus': os.cpu_count(),
+                         'representative': processes == 1},
+            'summary': summary.to_dict(orient='records'),
+            'peak_rss_mb': [round(rss, 1) for rss in peak_rss],
+            'reruns': measured,
+            'harness_errors': harness_errors,
+        }, f, indent=2, default=str)
+    print(f"Saved {path}")
+    if harness_error_rate > args.max_harness_error_rate:
+        print(f"Too many harness errors ({harness_error_rate:.1%} > {args.max_harness_error_rate:.1%}); "
+              f"the latencies may not be representative")
+        return 1
+    return 1 if summary.loc[0, 'errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
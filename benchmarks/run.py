@@ -0,0 +1,200 @@
+"""
+Benchmark suite for the data and chart pipelines behind the pages, on synthetic data.
+
+Times the code the pages run once their queries return: the Home page's round summary,
+token and project highlight charts, the Leaderboard tables and the Networks layout and
+traces. Figures are serialized as part of each timing, since st.plotly_chart sends them
+as JSON. Run from the repository root:
+
+    python benchmarks/run.py                    # every profile, compared with the baseline
+    python benchmarks/run.py --profile small    # one profile
+    python benchmarks/run.py --update-baseline  # record this machine's timings as the baseline
+
+Each run is saved to benchmarks/results/. The run fails (exit status 1) when a case is slower
+than its baseline by more than `--tolerance` (relative, or the case's entry in `case_tolerance`)
+plus `noise_floor` seconds. Record the baseline with as many CPUs as the deployed machine
+(`target_cpus`, the fly.toml [[vm]] cpus), e.g. `taskset -c 0,1 python benchmarks/run.py --update-baseline`.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# utils reads the database settings at import time; the benchmarks never connect
+for prefix in ('GRANTS', 'INDEXER'):
+    for setting in ('HOST', 'PORT', 'NAME', 'USERNAME', 'PASSWORD'):
+        os.environ.setdefault(f'{prefix}_DB_{setting}', '')
+os.environ.setdefault('PERF_LOG', '0')
+
+import numpy as np
+import pandas as pd
+
+import charts
+import network
+import utils
+from benchmarks import synthetic
+
+benchmark_dir = os.path.dirname(os.path.abspath(__file__))
+baseline_path = os.path.join(benchmark_dir, 'baseline.json')
+results_dir = os.path.join(benchmark_dir, 'results')
+noise_floor = 0.005  # seconds; differences below this are timer noise
+target_cpus = 2  # CPUs of the deployed machine (fly.toml), which the baseline should be recorded with
+case_tolerance = {  # case -> allowed slowdown, for cases noisier than the default tolerance allows
+    'network_figure': 0.5,  # 50 layout iterations over thousands of nodes, sensitive to CPU contention
+}
+seed = 0  # seed of the synthetic data and of the network layout, so every run times the same work
+
+PROFILES = {  # name -> program and round sizes
+    'small': dict(rounds=5, projects_per_round=30, hours=336, donors=2000),
+    'medium': dict(rounds=25, projects_per_round=50, hours=336, donors=10000),
+    'large': dict(rounds=100, projects_per_round=60, hours=1000, donors=40000),
+}
+
+
+def time_call(func, repeat):
+    """Median wall-clock time of `repeat` calls, in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def cpu_count():
+    """CPUs this process may run on (respects taskset)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        return os.cpu_count()
+
+
+def network_figure(voters):
+    """The Networks page for one round: filter, index the graph, lay it out and build the traces."""
+    votes = utils.filter_network_votes(voters, utils.network_default_min_donation)
+    node_names, src, dst = network.bipartite_edges(votes['voter_id'], votes['project_name'])
+    is_project = np.isin(node_names, votes['project_name'].unique())
+    node_colors = np.where(is_project, '#00433B', '#C4F092')
+    coords = network.force_layout(src, dst, len(node_names), k=.09, iterations=50, seed=seed)
+    layout = pd.DataFrame({'node': node_names, 'x': coords[:, 0], 'y': coords[:, 1], 'z': coords[:, 2]})
+    pos = network.layout_positions(layout, node_names, src, dst)
+    return charts.create_network_figure(node_names, pos, src, dst, node_colors, '#6E9A82')
+
+
+def make_cases(rounds, projects_per_round, hours, donors):
+    """Synthetic inputs for one profile and the benchmark cases running on them: name -> function."""
+    dfp, dfr, hourly_contributions = synthetic.make_program(rounds, projects_per_round, hours, seed=seed)
+    # Leaderboard over the whole program; Networks over its first round, as the pages select them
+    voters = synthetic.make_voters(dfp, donors, seed=seed)
+    leaderboard = synthetic.make_donor_leaderboard(voters, utils.leaderboard_size)
+    round_voters = synthetic.make_voters(dfp[dfp['round_id'] == dfr['round_id'].iloc[0]], donors // 4, seed=seed)
+    start = pd.to_datetime(dfr['donations_start_time'].min(), utc=True)
+    end = pd.to_datetime(dfr['donations_end_time'].max(), utc=True)
+    # Call the undecorated function so st.cache_data doesn't turn repeats into cache hits
+    generate_round_summary = utils.generate_round_summary.__wrapped__
+
+    return {
+        'round_summary': lambda: generate_round_summary(hourly_contributions, dfp, dfr),
+        'token_distribution_chart': lambda: charts.create_token_distribution_chart(hourly_contributions).to_json(),
+        # A rerun restoring the donation chart from the figure cache instead of building it
+        'donation_chart_cached': lambda: charts.cached_figure(
+            'benchmark-donations', f'{rounds}-{hours}-{seed}', charts.get_combined_donation_chart,
+            hourly_contributions, start, end, {}).to_json(),
+        'project_highlights': lambda: charts.build_project_highlights(dfp).to_json(),
+        'leaderboard': lambda: utils.format_donor_leaderboard(leaderboard),
+        'network_figure': lambda: network_figure(round_voters).to_json(),
+    }
+
+
+def run(profiles, repeat):
+    results = {}
+    for profile in profiles:
+        sizes = PROFILES[profile]
+        for case, func in make_cases(**sizes).items():
+            name = f'{profile}/{case}'
+            results[name] = round(time_call(func, repeat), 5)
+            print(f"{name:<40} {results[name]:>9.4f}s")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Cases slower than the baseline allows: list of (name, seconds, baseline seconds)."""
+    regressions = []
+    for name, seconds in results.items():
+        expected = baseline.get(name)
+        allowed = case_tolerance.get(name.split('/', 1)[1], tolerance)
+        if expected is not None and seconds > expected * (1 + allowed) + noise_floor:
+            regressions.append((name, seconds, expected))
+    return regressions
+
+
+def save_results(results, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    record = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'cpus': cpu_count(),
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(record, f, indent=2)
+        f.write('\n')
+
+
+def load_baseline(path=baseline_path):
+    """The baseline's (results, CPU count); ({}, None) when there is none yet."""
+    try:
+        with open(path, 'r') as f:
+            record = json.load(f)
+    except FileNotFoundError:
+        return {}, None
+    return record['results'], record.get('cpus')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--profile', choices=sorted(PROFILES), action='append',
+                        help='Profile to run (repeatable; default: all)')
+    parser.add_argument('--repeat', type=int, default=7, help='Runs per case; the median is kept')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown over the baseline (0.25 = 25%%)')
+    parser.add_argument('--update-baseline', action='store_true', help='Save this run as the baseline')
+    args = parser.parse_args(argv)
+
+    results = run(args.profile or list(PROFILES), args.repeat)
+    timestamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    save_results(results, os.path.join(results_dir, f'{timestamp}.json'))
+
+    if args.update_baseline:
+        if cpu_count() != target_cpus:
+            print(f"Warning: recording the baseline with {cpu_count()} CPUs; the deployed machine has {target_cpus}.")
+        baseline, _ = load_baseline()
+        baseline.update(results)
+        save_results(baseline, baseline_path)
+        print(f"Baseline updated: {baseline_path}")
+        return 0
+
+    baseline, baseline_cpus = load_baseline()
+    if not baseline:
+        print("No baseline yet; run with --update-baseline to record one.")
+        return 0
+    if baseline_cpus != cpu_count():
+        print(f"Warning: the baseline was recorded with {baseline_cpus} CPUs and this run has {cpu_count()}; "
+              f"timings may not be comparable (use taskset to match).")
+    regressions = compare(results, baseline, args.tolerance)
+    for name, seconds, expected in regressions:
+        print(f"REGRESSION {name}: {seconds:.4f}s vs. baseline {expected:.4f}s")
+    if regressions:
+        return 1
+    print(f"No regressions against the baseline ({len(results)} cases, tolerance {args.tolerance:.0%}).")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+Seed a local Postgres with synthetic grants data, as a stand-in for the production database.
+
+Creates the tables the Home, Leaderboard and Networks queries read (rounds, program_round_labels,
+applications, donations and the ENS names view) with the columns they use, fills them with
+synthetic programs, and derives the round and application totals from the donations the
+way the indexer does. Point the GRANTS_DB_* settings at an empty database, e.g.
+
+    docker run -d --name grants-db -e POSTGRES_PASSWORD=postgres -p 5432:5432 postgres:16
+    export GRANTS_DB_HOST=localhost GRANTS_DB_PORT=5432 GRANTS_DB_NAME=postgres \\
+           GRANTS_DB_USERNAME=postgres GRANTS_DB_PASSWORD=postgres
+    python benchmarks/seed_db.py --programs 3 --rounds 20 --donations 500000
+
+Existing tables of the same names are dropped first.
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+from benchmarks.synthetic import TOKENS
+
+ens_view = '"experimental_views"."ens_names_allo_donors_20241022231136"'
+
+schema = f"""
+DROP TABLE IF EXISTS public.donations, public.applications, public.program_round_labels, public.rounds;
+DROP TABLE IF EXISTS {ens_view};
+CREATE SCHEMA IF NOT EXISTS experimental_views;
+
+CREATE TABLE public.rounds (
+    id text NOT NULL,
+    chain_id integer NOT NULL,
+    round_metadata jsonb,
+    total_amount_donated_in_usd double precision DEFAULT 0,
+    total_donations_count integer DEFAULT 0,
+    unique_donors_count integer DEFAULT 0,
+    donations_start_time timestamptz,
+    donations_end_time timestamptz,
+    match_amount_in_usd double precision,
+    match_token_address text,
+    matching_distribution jsonb,
+    PRIMARY KEY (id, chain_id)
+);
+CREATE TABLE public.program_round_labels (
+    round_number integer,
+    program text,
+    type text,
+    chain_name text,
+    chain_id integer,
+    round_id text
+);
+CREATE TABLE public.applications (
+    id text NOT NULL,
+    chain_id integer NOT NULL,
+    round_id text NOT NULL,
+    project_id text,
+    status text,
+    metadata jsonb,
+    total_donations_count integer DEFAULT 0,
+    total_amount_donated_in_usd double precision DEFAULT 0,
+    unique_donors_count integer DEFAULT 0,
+    PRIMARY KEY (chain_id, round_id, id)
+);
+CREATE TABLE public.donations (
+    id text PRIMARY KEY,
+    chain_id integer NOT NULL,
+    round_id text NOT NULL,
+    application_id text NOT NULL,
+    donor_address text NOT NULL,
+    recipient_address text,
+    project_id text,
+    token_address text,
+    amount_in_usd double precision,
+    timestamp timestamptz
+);
+CREATE TABLE {ens_view} (
+    address text PRIMARY KEY,
+    name text
+);
+"""
+
+indexes_and_totals = """
+CREATE INDEX ON public.donations (round_id, chain_id);
+CREATE INDEX ON public.donations (timestamp);
+
+UPDATE public.applications a
+SET total_donations_count = t.n, total_amount_donated_in_usd = t.usd, unique_donors_count = t.donors
+FROM (
+    SELECT chain_id, round_id, application_id, count(*) AS n, sum(amount_in_usd) AS usd, count(DISTINCT donor_address) AS donors
+    FROM public.donations GROUP BY 1, 2, 3
+) t
+WHERE a.chain_id = t.chain_id AND a.round_id = t.round_id AND a.id = t.application_id;
+
+UPDATE public.rounds r
+SET total_donations_count = t.n, total_amount_donated_in_usd = t.usd, unique_donors_count = t.donors
+FROM (
+    SELECT chain_id, round_id, count(*) AS n, sum(amount_in_usd) AS usd, count(DISTINCT donor_address) AS donors
+    FROM public.donations GROUP BY 1, 2
+) t
+WHERE r.chain_id = t.chain_id AND r.id = t.round_id;
+"""
+
+
+def make_tables(programs, rounds, projects_per_round, donors, donations, live_rounds=1, seed=0):
+    """
+    Synthetic rows for every seeded table, as DataFrames keyed by table name.
+
+    Each program has `rounds` rounds of `projects_per_round` projects over two weeks; the first
+    `live_rounds` rounds of the first program are still open, so the live-refresh paths run too.
+    Donations are spread over `donors` addresses with heavy-tailed project popularity.
+    """
+    rng = np.random.default_rng(seed)
+    chain_ids = sorted({t[0] for t in TOKENS})
+    now = pd.Timestamp.now(tz='UTC').floor('h')
+
+    round_rows, label_rows, application_rows = [], [], []
+    for p in range(programs):
+        program = f'SYNTH{p + 1}'
+        for r in range(rounds):
+            round_id = f'0x{p:08x}{r:032x}'
+            chain_id = int(rng.choice(chain_ids))
+            live = p == 0 and r < live_rounds
+            end = now + pd.Timedelta(days=3) if live else now - pd.Timedelta(days=30 * (p * rounds + r + 1))
+            start = end - pd.Timedelta(days=14)
+            round_rows.append({
+                'id': round_id,
+                'chain_id': chain_id,
+                'round_metadata': json.dumps({'name': f'{program} Round {r:03d}', 'quadraticFundingConfig': {
+                    'matchingCap': True, 'matchingCapAmount': 10, 'matchingFundsAvailable': 50000,
+                    'minDonationThreshold': True, 'minDonationThresholdAmount': 1, 'sybilDefense': 'passport'}}),
+                'donations_start_time': start,
+                'donations_end_time': end,
+                'match_amount_in_usd': round(float(rng.lognormal(11, 1)), 2),
+                'match_token_address': TOKENS[0][1],
+                'matching_distribution': None if live else '[]',
+            })
+            label_rows.append({'round_number': 22 + p, 'program': program, 'type': 'program' if r < rounds // 2 else 'ecosystem',
+                               'chain_name': 'SYNTH', 'chain_id': chain_id, 'round_id': round_id})
+            for a in range(projects_per_round):
+                recipient = f'0x{p:04x}{r:06x}{a:030x}'
+                application_rows.append({
+                    'id': str(a),
+                    'chain_id': chain_id,
+                    'round_id': round_id,
+                    'project_id': f'0x{p:08x}{r:024x}{a:032x}',
+                    'status': 'APPROVED',
+                    'metadata': json.dumps({'application': {'recipient': recipient,
+                                                            'project': {'title': f'{program} Project {r:03d}-{a:03d}'}}}),
+                    'recipient': recipient,
+                })
+
+    dfr = pd.DataFrame(round_rows)
+    dfa = pd.DataFrame(application_rows)
+
+    # Donations: pick a project by popularity, a donor, a token of the round's chain and a time in the window
+    popularity = rng.pareto(1.2, len(dfa)) + 1
+    project_index = rng.choice(len(dfa), size=donations, p=popularity / popularity.sum())
+    projects = dfa.iloc[project_index].reset_index(drop=True)
+    windows = projects[['round_id']].merge(dfr, left_on='round_id', right_on='id', how='left')
+    start = windows['donations_start_time']
+    end = windows['donations_end_time'].clip(upper=now)
+    timestamp = start + (end - start) * rng.random(donations)
+    token_address = np.empty(donations, dtype=object)
+    for chain_id in chain_ids:
+        chain_tokens = [t[1] for t in TOKENS if t[0] == chain_id]
+        on_chain = (projects['chain_id'] == chain_id).to_numpy()
+        token_address[on_chain] = rng.choice(chain_tokens, int(on_chain.sum()))
+    addresses = np.array([f'0x{i:040x}' for i in range(donors)], dtype=object)
+    activity = rng.pareto(1.5, donors) + 1  # most donors give a few times, some give hundreds
+    dfd = pd.DataFrame({
+        'id': np.arange(donations).astype(str),
+        'chain_id': projects['chain_id'],
+        'round_id': projects['round_id'],
+        'application_id': projects['id'],
+        'donor_address': addresses[rng.choice(donors, size=donations, p=activity / activity.sum())],
+        'recipient_address': projects['recipient'],
+        'project_id': projects['project_id'],
+        'token_address': token_address,
+        'amount_in_usd': rng.lognormal(1, 1.5, donations).round(6),
+        'timestamp': timestamp,
+    })
+
+    with_ens = np.flatnonzero(rng.random(donors) < 0.2)
+    ens = pd.DataFrame({'address': addresses[with_ens], 'name': [f'donor{i}.eth' for i in with_ens]})
+    return {
+        'public.rounds': dfr,
+        'public.program_round_labels': pd.DataFrame(label_rows),
+        'public.applications': dfa.drop(columns='recipient'),
+        'public.donations': dfd,
+        ens_view: ens,
+    }
+
+
+def copy_frame(cursor, table, df):
+    """Bulk-load `df` into `table` with COPY."""
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False, na_rep='\\N')
+    buffer.seek(0)
+    columns = ', '.join(f'"{c}"' for c in df.columns)
+    cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer)
+
+
+def seed(programs, rounds, projects_per_round, donors, donations, live_rounds=1, seed=0):
+    start = time.time()
+    tables = make_tables(programs, rounds, projects_per_round, donors, donations, live_rounds, seed)
+    conn = db.pg.connect(**db.get_db_config('grants'))
+    try:
+        with conn, conn.cursor() as cursor:
+            cursor.execute(schema)
+            for table, df in tables.items():
+                copy_frame(cursor, table, df)
+                print(f"Loaded {len(df):,} rows into {table}")
+            cursor.execute(indexes_and_totals)
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute('ANALYZE')
+    finally:
+        conn.close()
+    print(f"Seeded the database in {time.time() - start:.1f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Seed a local Postgres with synthetic grants data.')
+    parser.add_argument('--programs', type=int, default=3)
+    parser.add_argument('--rounds', type=int, default=20, help='Rounds per program')
+    parser.add_argument('--projects', type=int, default=50, help='Projects per round')
+    parser.add_argument('--donors', type=int, default=50000)
+    parser.add_argument('--donations', type=int, default=500000)
+    parser.add_argument('--live-rounds', type=int, default=1, help='Rounds of the first program still accepting donations')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    seed(args.programs, args.rounds, args.projects, args.donors, args.donations, args.live_rounds, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Synthetic program datasets shaped like the frames utils.load_round_data returns,
+for benchmarking the data pipelines without the production Postgres.
+"""
+import numpy as np
+import pandas as pd
+
+TOKENS = [(10, '0x0000000000000000000000000000000000000000', 'ETH'),
+          (10, '0x4200000000000000000000000000000000000042', 'OP'),
+          (42161, '0xaf88d065e77c8cc2239327c5edb3a432268e5831', 'USDC'),
+          (42161, '0x912ce59144191c1204e64559fe8253a0e49e6548', 'ARB'),
+          (42220, '0x471ece3750da237f93b8e339c536989b8978a438', 'CELO')]
+
+
+def make_rounds(rounds, seed=0, start='2024-10-23'):
+    """Round-level frame like utils.get_round_data(), filtered to one program, with round options added."""
+    rng = np.random.default_rng(seed)
+    start_time = pd.Timestamp(start, tz='UTC')
+    chain_ids = rng.choice(sorted({t[0] for t in TOKENS}), rounds)
+    amounts = rng.lognormal(10, 1.5, rounds).round(2)
+    dfr = pd.DataFrame({
+        'round_name': [f'Round {i:03d}' for i in range(rounds)],
+        'round_number': 22,
+        'program': 'SYNTH',
+        'type': np.where(np.arange(rounds) < rounds // 2, 'program', 'ecosystem'),
+        'chain_name': 'SYNTH',
+        'amountUSD': amounts,
+        'votes': rng.integers(100, 50000, rounds),
+        'uniqueContributors': rng.integers(50, 20000, rounds),
+        'chain_id': chain_ids,
+        'round_id': [f'0x{i:040x}' for i in range(rounds)],
+        'donations_end_time': start_time + pd.Timedelta(days=14),
+        'donations_start_time': start_time,
+        'match_amount_in_usd': rng.lognormal(11, 1, rounds).round(2),
+    })
+    dfr['options'] = dfr['round_name'] + ' | ' + dfr['type'].str.capitalize() + ' Round'
+    return dfr
+
+
+def make_projects(dfr, projects_per_round, seed=0):
+    """Approved applications like utils.get_projects()."""
+    rng = np.random.default_rng(seed + 1)
+    n = len(dfr) * projects_per_round
+    rounds = dfr.loc[dfr.index.repeat(projects_per_round)].reset_index(drop=True)
+    votes = rng.integers(1, 5000, n)
+    return pd.DataFrame({
+        'application_id': np.tile(np.arange(projects_per_round).astype(str), len(dfr)),
+        'title': [f'Project {i:06d}' for i in range(n)],
+        'recipient_address': [f'0x{i:040x}' for i in range(n)],
+        'round_name': rounds['round_name'],
+        'chain_id': rounds['chain_id'].astype(str),
+        'round_id': rounds['round_id'],
+        'projectId': [f'0x{i:064x}' for i in range(n)],
+        'status': 'APPROVED',
+        'votes': votes,
+        'amountUSD': (votes * rng.lognormal(1, 1, n)).round(2),
+        'unique_donors_count': (votes * 0.8).astype(int),
+    })
+
+
+def make_hourly_contributions(dfr, hours, seed=0, density=0.6):
+    """Hourly USD totals per round and token like utils.get_hourly_contributions()."""
+    rng = np.random.default_rng(seed + 2)
+    start = pd.to_datetime(dfr['donations_start_time'].min(), utc=True)
+    frames = []
+    for chain_id, round_id in zip(dfr['chain_id'], dfr['round_id']):
+        tokens = [t for t in TOKENS if t[0] == chain_id]
+        hour_index = np.flatnonzero(rng.random(hours) < density)
+        for _, token_address, token_code in tokens:
+            frames.append(pd.DataFrame({
+                'hour': start + pd.to_timedelta(hour_index, unit='h'),
+                'chain_id': chain_id,
+                'round_id': round_id,
+                'token_address': token_address,
+                'total_amount': rng.lognormal(3, 1.5, len(hour_index)).round(2),
+                'token_code': token_code,
+            }))
+    return pd.concat(frames, ignore_index=True).sort_values(['hour', 'chain_id', 'round_id', 'token_address'], ignore_index=True)
+
+
+def make_program(rounds=10, projects_per_round=50, hours=336, seed=0):
+    """Return (dfp, dfr, hourly_contributions) for one synthetic program."""
+    dfr = make_rounds(rounds, seed=seed)
+    return make_projects(dfr, projects_per_round, seed=seed), dfr, make_hourly_contributions(dfr, hours, seed=seed)
+
+
+def make_voters(dfp, donors, seed=0, projects_per_donor=4.0, ens_share=0.2):
+    """
+    Donor x project totals like utils.get_voters_by_project(), for the projects in `dfp`.
+
+    Donors support a geometric number of projects (mean `projects_per_donor`), picked with a
+    heavy-tailed popularity so a few projects draw most donors, as in real rounds.
+    """
+    rng = np.random.default_rng(seed + 3)
+    titles = dfp['title'].to_numpy()
+    counts = np.minimum(rng.geometric(1 / projects_per_donor, donors), len(titles))
+    donor_index = np.repeat(np.arange(donors), counts)
+    popularity = rng.pareto(1.2, len(titles)) + 1
+    project_index = rng.choice(len(titles), size=len(donor_index), p=popularity / popularity.sum())
+    addresses = np.array([f'0x{i:040x}' for i in range(donors)], dtype=object)
+    voter_ids = addresses.copy()
+    has_ens = rng.random(donors) < ens_share
+    voter_ids[has_ens] = [f'donor{i}.eth' for i in np.flatnonzero(has_ens)]
+    voters = pd.DataFrame({
+        'project_name': titles[project_index],
+        'voter': addresses[donor_index],
+        'voter_id': voter_ids[donor_index],
+        'amountUSD': rng.lognormal(1, 1.5, len(donor_index)).round(2),
+    })
+    voters = voters.groupby(['project_name', 'voter', 'voter_id'], as_index=False, sort=False)['amountUSD'].sum()
+    return voters.sort_values('amountUSD', ascending=False, ignore_index=True)
+
+
+def make_donor_leaderboard(voters, limit=100):
+    """What queries/get_donor_leaderboard.sql returns for the donations in `voters`."""
+    totals = voters.groupby('voter_id').agg(amountUSD=('amountUSD', 'sum'), unique_grants=('project_name', 'nunique'))
+    totals = totals.reset_index()
+    totals['generous_rank'] = totals.sort_values(['amountUSD', 'voter_id'], ascending=[False, True]).index.argsort() + 1
+    totals['loving_rank'] = totals.sort_values(['unique_grants', 'voter_id'], ascending=[False, True]).index.argsort() + 1
+    ranked = totals[(totals['generous_rank'] <= limit) | (totals['loving_rank'] <= limit)]
+    return ranked.sort_values('generous_rank', ignore_index=True)
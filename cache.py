@@ -0,0 +1,343 @@
+import functools
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import pandas as pd
+
+
+# Cached frames are shared between sessions and handed out as shallow copies; with
+# copy-on-write a caller modifying its copy never writes through to the shared entry.
+# pandas 3 always behaves this way and deprecates the option.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+result_cache_max_bytes = int(float(os.environ.get('RESULT_CACHE_MAX_MB', 1024)) * 1024 ** 2)
+cache_max_stale = float(os.environ.get('CACHE_MAX_STALE', 3600))  # serve expired entries for up to an hour while refreshing
+refresh_max_workers = int(os.environ.get('CACHE_REFRESH_WORKERS', 4))
+
+
+def estimate_size(value):
+    """Approximate the memory held by a cached value, counting DataFrame contents deeply."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+def read_only_view(value):
+    """Give callers their own shallow copy of a cached value so they cannot alter the shared entry."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    if isinstance(value, tuple):
+        return tuple(read_only_view(v) for v in value)
+    if isinstance(value, list):
+        return [read_only_view(v) for v in value]
+    if isinstance(value, dict):
+        return {k: read_only_view(v) for k, v in value.items()}
+    return value
+
+
+def _hash_arg(h, value):
+    if isinstance(value, pd.DataFrame):
+        h.update(repr((value.shape, list(value.columns))).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, (list, tuple)):
+        h.update(f'{type(value).__name__}{len(value)}('.encode())
+        for v in value:
+            _hash_arg(h, v)
+        h.update(b')')
+    elif isinstance(value, dict):
+        h.update(b'dict(')
+        for k in sorted(value, key=repr):
+            _hash_arg(h, k)
+            _hash_arg(h, value[k])
+        h.update(b')')
+    else:
+        h.update(repr(value).encode())
+        h.update(b',')
+
+
+def make_key(func, args, kwargs):
+    """Build a cache key from a function and its arguments, hashing DataFrames by content."""
+    h = hashlib.sha1(f'{func.__module__}.{func.__qualname__}'.encode())
+    _hash_arg(h, args)
+    _hash_arg(h, kwargs)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache bounded by the memory its values hold.
+
+    Each entry is stored with its estimated size in bytes. When adding an entry pushes the
+    total above `max_bytes`, least recently used entries are evicted until it fits again.
+    Entries expire after their own TTL, but lookups may still accept them for a while
+    as stale (see lookup).
+    """
+
+    def __init__(self, max_bytes=result_cache_max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size, expires_at, stored_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def get(self, key):
+        """Return (True, read-only view of the value) on a hit, or (False, None) on a miss."""
+        state, value = self.lookup(key)
+        return state == 'fresh', value
+
+    def lookup(self, key, max_stale=0):
+        """
+        Look up `key`, accepting entries that expired less than `max_stale` seconds ago.
+
+        :return: ('fresh', value), ('stale', value) or ('miss', None); values are read-only views
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.monotonic()
+            if entry is not None and entry[2] + max_stale < now:
+                self._remove(key)
+                self._stats['expirations'] += 1
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+                return 'miss', None
+            self._entries.move_to_end(key)
+            state = 'fresh' if entry[2] >= now else 'stale'
+            self._stats['hits' if state == 'fresh' else 'stale_hits'] += 1
+            value = entry[0]
+        return state, read_only_view(value)
+
+    def set(self, key, value, ttl):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return  # never worth evicting everything else for one value
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + ttl, time.time())
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats['evictions'] += 1
+
+    def ttl_remaining(self, key):
+        """Seconds until the entry for `key` expires, or None if it is not cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return max(entry[2] - time.monotonic(), 0.0)
+
+    def stored_at(self, key):
+        """Wall-clock time (epoch seconds) at which the value for `key` was stored, or None if it is not cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[3] if entry is not None else None
+
+    def stored_bytes(self, key):
+        """Estimated size in bytes of the value stored for `key`, or None if it is not cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[1] if entry is not None else None
+
+    def _remove(self, key):
+        size = self._entries.pop(key)[1]
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Return hit/miss/eviction counters along with the current entry count and memory use."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+            stats['max_bytes'] = self.max_bytes
+        lookups = stats['hits'] + stats['stale_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['stale_hits']) / lookups if lookups else 0.0
+        return stats
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into a single execution.
+
+    The first caller runs the function; callers arriving with the same key while it is
+    in flight wait for it and get (a read-only view of) the same result or exception.
+    Nothing is kept once the call completes, so this does not cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}  # key -> [done event, result, exception]
+        self._stats = {'executions': 0, 'coalesced': 0}
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = [threading.Event(), None, None]
+                self._stats['executions'] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            flight[0].wait()
+            if flight[2] is not None:
+                raise flight[2]
+            return read_only_view(flight[1])
+
+        try:
+            flight[1] = func(*args, **kwargs)
+            return flight[1]
+        except BaseException as e:
+            flight[2] = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight[0].set()
+
+    def stats(self):
+        """Return how many calls ran and how many joined one already in flight (executions saved)."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._flights)
+        calls = stats['executions'] + stats['coalesced']
+        stats['coalesced_rate'] = stats['coalesced'] / calls if calls else 0.0
+        return stats
+
+
+result_cache = ResultCache()
+cache_flights = SingleFlight()  # concurrent misses on the same entry compute it once
+
+
+_refresh_executor = ThreadPoolExecutor(max_workers=refresh_max_workers, thread_name_prefix='cache-refresh')
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def is_empty(value):
+    """Whether a value is an empty DataFrame or Series, which is how a failed query comes back."""
+    return isinstance(value, (pd.DataFrame, pd.Series)) and value.empty
+
+
+def cached(ttl, cache=result_cache, max_stale=cache_max_stale, cache_empty=True, key=None):
+    """
+    Decorator caching a function's return value in `cache` for `ttl` seconds.
+
+    Used instead of st.cache_resource for the query results, so their memory is bounded.
+    Callers always receive a read-only view of the cached value.
+
+    Stale-while-revalidate: for `max_stale` seconds after an entry expires, callers still get
+    the old value immediately while a single background call recomputes it. Only entries older
+    than that make the caller wait. Pass max_stale=0 to always recompute on expiry.
+
+    With cache_empty=False, empty DataFrame results are returned without being stored, so a
+    failed query is retried on the next call instead of being served for the whole TTL.
+    Background refreshes and refresh() never store an empty result over the cached one: a
+    failed query comes back empty (see utils._execute_query), and the old value is still good.
+
+    `key`, if given, is called with the function's arguments and its return value is hashed
+    into the cache key instead of them, e.g. to key on a small fingerprint of a large frame.
+
+    The wrapper also has `refresh(*args, **kwargs)`, which recomputes and stores the value for
+    those arguments, `ttl_remaining(*args, **kwargs)`, the seconds until their entry expires
+    (None if absent), `cached_at(*args, **kwargs)`, when their value was computed, and
+    `with_state(*args, **kwargs)`, which returns (value, state) with state one of 'fresh',
+    'stale', 'miss' (computed by this call) or 'coalesced' (waited on another call computing it).
+    """
+    def decorator(func):
+        def key_of(args, kwargs):
+            return make_key(func, (key(*args, **kwargs),), {}) if key else make_key(func, args, kwargs)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return with_state(*args, **kwargs)[0]
+
+        def with_state(*args, **kwargs):
+            entry_key = key_of(args, kwargs)
+            state, value = cache.lookup(entry_key, max_stale)
+            if state == 'stale':
+                revalidate(entry_key, args, kwargs)
+            if state != 'miss':
+                return value, state
+            outcome = ['coalesced']  # only this call's own compute() changes it
+            value = cache_flights.do(entry_key, compute, entry_key, args, kwargs, outcome)
+            return value, outcome[0]
+
+        def compute(entry_key, args, kwargs, outcome):
+            found, value = cache.get(entry_key)  # a call that just finished may have stored it
+            if found:
+                outcome[0] = 'fresh'
+                return value
+            outcome[0] = 'miss'
+            return store(entry_key, func(*args, **kwargs))
+
+        def store(entry_key, value, replace=False):
+            if is_empty(value):
+                if replace:
+                    state, cached_value = cache.lookup(entry_key, max_stale)
+                    if state != 'miss':
+                        print(f"Refresh of {func.__qualname__} returned no rows; keeping the cached value")
+                        return cached_value
+                if not cache_empty:
+                    return read_only_view(value)
+            cache.set(entry_key, value, ttl)
+            return read_only_view(value)
+
+        def revalidate(entry_key, args, kwargs):
+            with _refreshing_lock:
+                if entry_key in _refreshing:
+                    return  # another caller already started the refresh
+                _refreshing.add(entry_key)
+
+            def run():
+                try:
+                    store(entry_key, func(*args, **kwargs), replace=True)
+                except Exception as e:
+                    print(f"Background refresh of {func.__qualname__} failed. Error: {e}")
+                finally:
+                    with _refreshing_lock:
+                        _refreshing.discard(entry_key)
+
+            _refresh_executor.submit(run)
+
+        def refresh(*args, **kwargs):
+            return store(key_of(args, kwargs), func(*args, **kwargs), replace=True)
+
+        def ttl_remaining(*args, **kwargs):
+            return cache.ttl_remaining(key_of(args, kwargs))
+
+        def cached_at(*args, **kwargs):
+            stored_at = cache.stored_at(key_of(args, kwargs))
+            return datetime.fromtimestamp(stored_at, tz=timezone.utc) if stored_at is not None else None
+
+        def stored_bytes(*args, **kwargs):
+            return cache.stored_bytes(key_of(args, kwargs))
+
+        wrapper.refresh = refresh
+        wrapper.ttl_remaining = ttl_remaining
+        wrapper.cached_at = cached_at
+        wrapper.stored_bytes = stored_bytes
+        wrapper.with_state = with_state
+        return wrapper
+    return decorator
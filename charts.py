@@ -0,0 +1,422 @@
+import json
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.graph_objs as go
+import plotly.express as px
+import plotly.io as pio
+from plotly.subplots import make_subplots
+import cache
+import perf
+import network
+
+
+figure_cache_ttl = 3600  # figures are keyed by data version, so this only bounds how long unused versions linger
+
+
+def cached_figure(name, version, build, *args):
+    """
+    Return the figure `build(*args)`, built once per (name, version) and reused by every rerun and session.
+
+    The figure is stored in the result cache as its JSON spec, so its memory is counted exactly,
+    and is restored without re-running Plotly's validation. Pass a `version` that changes whenever
+    the data behind the figure does, e.g. the program and its utils.get_data_version.
+
+    :param name: Figure type, e.g. 'token-distribution'
+    :param version: String identifying the figure's data
+    :param build: Function returning a Plotly figure
+    """
+    key = f'figure-{name}-{version}'
+    found, spec = cache.result_cache.get(key)
+    if not found:
+        spec = cache.cache_flights.do(key, _build_figure_spec, key, build, args)
+    return go.Figure(json.loads(spec), _validate=False)
+
+
+def _build_figure_spec(key, build, args):
+    found, spec = cache.result_cache.get(key)  # a concurrent caller may have just built it
+    if not found:
+        spec = pio.to_json(build(*args), validate=False)
+        cache.result_cache.set(key, spec, figure_cache_ttl)
+    return spec
+
+
+def get_cumulative_amountUSD_time_series_chart(dfv, starting_time, ending_time, color_map):
+    dfv_grouped = dfv.groupby(['round_name', dfv['block_timestamp'].dt.floor('H')])['amountUSD'].sum().reset_index()
+    dfv_grouped.set_index(['round_name', 'block_timestamp'], inplace=True)
+    dfv_grouped = dfv_grouped.reindex(pd.MultiIndex.from_product([dfv_grouped.index.get_level_values(0).unique(), pd.date_range(start=dfv_grouped.index.get_level_values(1).min(), end=dfv_grouped.index.get_level_values(1).max(), freq='H')], names=['round_name', 'block_timestamp']), fill_value=0)
+    dfv_cumulative = dfv_grouped.groupby(level=0).cumsum()
+    fig = px.area(dfv_cumulative, x=dfv_cumulative.index.get_level_values(1), y='amountUSD', color=dfv_cumulative.index.get_level_values(0), labels={'amountUSD': 'Total Donations (USD)', 'block_timestamp': 'Time'}, title='Cumulative Donations Over Time (USD) by Round', color_discrete_map=color_map)
+    fig.update_layout(xaxis_range=[starting_time, min(ending_time, dfv['block_timestamp'].max())], showlegend=True, legend_title_text='Round')
+    fig.update_xaxes(title_text='Time', nticks=5)
+    fig.update_yaxes(tickprefix="$", tickformat="2s", title_text='Cumulative Donations (USD)')
+    fig.update_traces(hovertemplate='<b>Round:</b> %{fullData.name}<br><b>Time:</b> %{x}<br><b>Total Donations:</b> $%{y:,.2f}')
+    return fig
+
+def create_token_distribution_chart(hourly_contributions):
+    # Group by token and sum the total_amount
+    token_data = hourly_contributions.groupby('token_code', observed=True)['total_amount'].sum().reset_index()
+    token_data = token_data.sort_values('total_amount', ascending=False)
+    
+    # Calculate percentages
+    total = token_data['total_amount'].sum()
+    token_data['percentage'] = token_data['total_amount'] / total * 100
+
+    # Define color mapping for common tokens
+    token_colors = {
+        'ETH': '#627eea',
+        'OP': '#ff0420',
+        'USDC': '#2775ca',
+        'CELO': '#35d07f',
+        'USDGLO': '#ffcc00',
+        'ARB': '#28a0f0',
+        'GTC': '#ff6b6b',
+        'DAI': '#f4b731',
+        'MATIC': '#8247e5'
+    }
+    
+    # Assign colors to tokens, use a default color if not in the mapping
+    token_data['color'] = token_data['token_code'].map(token_colors).fillna('#cccccc')
+
+    # Create the donut chart
+    fig = go.Figure(data=[go.Pie(
+        labels=token_data['token_code'],
+        values=token_data['total_amount'],
+        hole=.4,
+        textinfo='label+percent',
+        hovertemplate="<b>%{label}</b><br>Amount: $%{value:.2f}<br>Percentage: %{percent}<extra></extra>",
+        marker=dict(colors=token_data['color']),  # Use the mapped colors
+    )])
+
+    # Format total amount with appropriate suffix (K, M, B)
+    if total >= 1e9:
+        total_formatted = f"${total/1e9:.1f}B"
+    elif total >= 1e6:
+        total_formatted = f"${total/1e6:.1f}M"
+    elif total >= 1e3:
+        total_formatted = f"${total/1e3:.1f}K"
+    else:
+        total_formatted = f"${total:.2f}"
+
+    fig.update_layout(
+        title="Contributions (in USD) by Token",
+        annotations=[dict(text=f'Total<br>{total_formatted}', x=0.5, y=0.5, font_size=16, showarrow=False)],
+        showlegend=True,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+
+    return fig
+
+def calculate_qf_score(donations):
+    return (np.sum(np.sqrt(donations)))**2
+
+def top_projects(dfp):
+    """Return the top 3 funded, most donors and highest average donation projects, with an average_donation column."""
+    dfp = dfp.assign(average_donation=dfp['amountUSD'] / dfp['votes'])
+    return dfp.nlargest(3, 'amountUSD'), dfp.nlargest(3, 'votes'), dfp.nlargest(3, 'average_donation')
+
+def build_project_highlights(dfp):
+    """Return the donors vs. amount raised scatter of all projects."""
+    # Create visualization
+    fig = go.Figure()
+
+    # Scatter plot for all projects with log scale
+    fig.add_trace(go.Scatter(
+        x=dfp['votes'],
+        y=dfp['amountUSD'],
+        mode='markers',
+        marker=dict(
+            size=dfp['votes'],
+            sizemode='area',
+            sizeref=2.*max(dfp['votes'])/(25.**2),
+            sizemin=4,
+            color='#8e81f0',
+            opacity=0.7
+        ),
+        text=dfp['title'],
+        hovertemplate="<b>%{text}</b><br>" +
+                      "Total Raised: $%{y:,.2f}<br>" +
+                      "Unique Donors: %{x}<br>" +
+                      "<extra></extra>",
+        showlegend=False  
+    ))
+
+    fig.update_layout(
+        #title=None,
+        xaxis_title="Log. Unique Donors",
+        yaxis_title="Log. Total Raised (USD)",
+        height=600,
+        plot_bgcolor='white',
+        xaxis=dict(
+            showgrid=False,
+            zeroline=False,
+            linecolor='black',
+            linewidth=2,
+            showline=True,
+            type='log'
+        ),
+        yaxis=dict(
+            showgrid=False,
+            zeroline=False,
+            linecolor='black',
+            linewidth=2,
+            showline=True,
+            type='log'
+        ),
+        font=dict(family="monospace"),
+    )
+
+    return fig
+
+def create_project_highlights(dfp, version=None):
+    """Show the project highlights scatter, reused from the figure cache when `version` is given, and the top projects."""
+    if version is None:
+        fig = build_project_highlights(dfp)
+    else:
+        fig = cached_figure('project-highlights', version, build_project_highlights, dfp)
+    top_funded, top_donors, top_trending = top_projects(dfp)
+    perf.figure('project highlights', fig)
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Legend
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.subheader("🏆 Top Funded")
+        for _, project in top_funded.iterrows():
+            st.write(f"**{project['title'].strip()}**: ${project['amountUSD']:,.2f}")
+    with col2:
+        st.subheader("👥 Most Donors")
+        for _, project in top_donors.iterrows():
+            st.write(f"**{project['title'].strip()}**: {project['votes']:,}")
+    with col3:
+        st.subheader("💪🏾 Highest Average")
+        for _, project in top_trending.iterrows():
+            st.write(f"**{project['title'].strip()}**: ${project['average_donation']:,.2f}")
+
+def get_combined_donation_chart(hourly_contributions, starting_time, ending_time, color_map):
+    # Aggregate all tokens and chains by hour
+    hourly_totals = hourly_contributions.groupby('hour')['total_amount'].sum().reset_index()
+    
+    # Calculate cumulative sum
+    cumulative_totals = hourly_totals.copy()
+    cumulative_totals['total_amount'] = cumulative_totals['total_amount'].cumsum()
+
+    # Create figure with secondary y-axis
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    
+    # Add hourly bars
+    fig.add_trace(
+        go.Bar(
+            x=hourly_totals['hour'], 
+            y=hourly_totals['total_amount'], 
+            name="Hourly Contributions", 
+            marker_color='#8e81f0'
+        ),
+        secondary_y=False,
+    )
+    
+    # Add cumulative line
+    fig.add_trace(
+        go.Scatter(
+            x=cumulative_totals['hour'], 
+            y=cumulative_totals['total_amount'],
+            name="Cumulative Donations", 
+            line=dict(color='#000000', width=2)
+        ),
+        secondary_y=True,
+    )
+    
+    # Update layout
+    fig.update_layout(
+        title="Hourly Contributions and Cumulative Donations",
+        font=dict(family="monospace", size=12),
+        hovermode="x unified",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        xaxis=dict(
+            rangeslider=dict(visible=True),
+            type="date",
+            gridcolor='#ffffff'
+        ),
+        yaxis=dict(gridcolor='#ffffff'),
+        yaxis2=dict(gridcolor='#ffffff'),
+        height=550
+    )
+    
+    # Set axis titles and range
+    fig.update_xaxes(title_text="Time", range=[starting_time, min(ending_time, hourly_totals['hour'].max())])
+    fig.update_yaxes(title_text="Hourly Donations (USD)", secondary_y=False)
+    fig.update_yaxes(title_text="Cumulative Donations (USD)", secondary_y=True, tickprefix="$", tickformat=",.0f")
+    
+    return fig
+
+@st.cache_resource(ttl=3600)
+def create_treemap(votes_by_voter_and_project):
+    votes_by_voter_and_project['voter_id'] = votes_by_voter_and_project['voter_id'].str[:10] + '...'
+    votes_by_voter_and_project['shortened_title'] = votes_by_voter_and_project['project_name'].apply(lambda x: x if len(x) <= 15 else x[:15] + '...')
+    
+    fig = px.treemap(votes_by_voter_and_project, path=['shortened_title', 'voter_id'], values='amountUSD', hover_data=['project_name', 'amountUSD'])
+    # Update hovertemplate to format the hover information
+    fig.update_traces(
+        texttemplate='%{label}<br>$%{value:.3s}',
+        hovertemplate='<b>%{customdata[0]}</b><br>Amount: $%{customdata[1]:,.2f}',
+        textposition='middle center',
+        textfont_size=20
+    )
+    fig.update_traces(texttemplate='%{label}<br>$%{value:.3s}', textposition='middle center', textfont_size=20)
+    fig.update_layout(font=dict(size=20))
+    fig.update_layout(height=550)
+    fig.update_layout(title_text="Donations by Grant")
+    
+    return fig
+
+def create_project_spotlight(dfv, dfp):
+    st.header("Project Spotlight")
+
+    # Prepare data
+    project_metrics = dfv.groupby(['projectId', pd.Grouper(key='block_timestamp', freq='H')]).agg({
+        'amountUSD': 'sum',
+        'voter': 'nunique',
+        'id': 'count'
+    }).reset_index()
+
+    project_metrics = project_metrics.merge(dfp[['projectId', 'title']], on='projectId', how='left')
+    
+    # Get top 10 projects by total raised
+    top_projects = project_metrics.groupby('projectId').agg({
+        'amountUSD': 'sum',
+        'voter': 'nunique',
+        'id': 'count',
+        'title': 'first'
+    }).nlargest(10, 'amountUSD')
+
+    # Create interactive project selector
+    selected_project = st.selectbox("Select a project to spotlight", 
+                                    options=top_projects.index, 
+                                    format_func=lambda x: top_projects.loc[x, 'title'])
+
+    project_data = project_metrics[project_metrics['projectId'] == selected_project]
+
+    # Create subplot figure
+    fig = make_subplots(rows=2, cols=2, 
+                        subplot_titles=("Cumulative Donations", "Hourly Donations", 
+                                        "Unique Donors", "Donations vs Donors"),
+                        specs=[[{"secondary_y": True}, {"secondary_y": True}],
+                               [{"secondary_y": True}, {"type": "scatter"}]])
+
+    # Cumulative Donations
+    cumulative = project_data['amountUSD'].cumsum()
+    fig.add_trace(go.Scatter(x=project_data['block_timestamp'], y=cumulative, 
+                             name="Cumulative Donations"), row=1, col=1)
+
+    # Hourly Donations
+    fig.add_trace(go.Bar(x=project_data['block_timestamp'], y=project_data['amountUSD'], 
+                         name="Hourly Donations"), row=1, col=2)
+
+    # Unique Donors
+    cumulative_donors = project_data['voter'].cumsum()
+    fig.add_trace(go.Scatter(x=project_data['block_timestamp'], y=cumulative_donors, 
+                             name="Cumulative Donors"), row=2, col=1)
+
+    # Donations vs Donors scatter
+    fig.add_trace(go.Scatter(x=project_data['voter'], y=project_data['amountUSD'], 
+                             mode='markers', name="Donations vs Donors"), row=2, col=2)
+
+    # Update layout
+    fig.update_layout(height=800, title_text=f"Spotlight: {top_projects.loc[selected_project, 'title']}")
+    fig.update_xaxes(title_text="Time", row=1, col=1)
+    fig.update_xaxes(title_text="Time", row=1, col=2)
+    fig.update_xaxes(title_text="Time", row=2, col=1)
+    fig.update_xaxes(title_text="Unique Donors", row=2, col=2)
+    fig.update_yaxes(title_text="USD", row=1, col=1)
+    fig.update_yaxes(title_text="USD", row=1, col=2)
+    fig.update_yaxes(title_text="Donors", row=2, col=1)
+    fig.update_yaxes(title_text="Donation Amount (USD)", row=2, col=2)
+
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Project Stats
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total Raised", f"${top_projects.loc[selected_project, 'amountUSD']:,.2f}")
+    col2.metric("Unique Donors", f"{top_projects.loc[selected_project, 'voter']:,}")
+    col3.metric("Total Contributions", f"{top_projects.loc[selected_project, 'id']:,}")
+
+    # Recent Activity
+    st.subheader("Recent Activity")
+    recent = project_data.nlargest(10, 'block_timestamp')[['block_timestamp', 'amountUSD', 'voter']]
+    recent['block_timestamp'] = recent['block_timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    st.table(recent)
+
+
+def create_network_figure(node_names, pos, src, dst, node_colors, line_color):
+    """
+    3D figure of a donor-project network.
+
+    :param node_names: Node names, in the order of `pos` and `node_colors`
+    :param pos: (n_nodes, 3) array of node positions
+    :param src: Array of edge source node indices
+    :param dst: Array of edge target node indices
+    :param node_colors: Color of each node
+    :param line_color: Color of the edges
+    """
+    # Extract node information
+    node_x, node_y, node_z = pos.T  # z-coordinates for 3D
+    # Compute the degrees of the nodes 
+    degrees = network.node_degrees(src, dst, len(node_names))
+    # Apply the natural logarithm to the degrees 
+    log_degrees = np.log(degrees + 1)
+    # Min-Max scaling manually
+    #min_size = 10  # minimum size
+    #max_size = 50  # maximum size
+    #node_sizes = ((log_degrees - np.min(log_degrees)) / (np.max(log_degrees) - np.min(log_degrees))) * (max_size - min_size) + min_size
+    node_sizes = log_degrees * 10
+
+    # Extract edge information, one NaN-separated segment per edge
+    edge_x, edge_y, edge_z = network.edge_coordinates(pos, src, dst).T
+
+    # Create the edge traces
+    edge_trace = go.Scatter3d(
+        x=edge_x, y=edge_y, z=edge_z, 
+        line=dict(width=1, color=line_color),
+        hoverinfo='none',
+        mode='lines',
+        marker=dict(opacity=0.5))
+
+
+    # Create the node traces
+    node_trace = go.Scatter3d(
+        x=node_x, y=node_y, z=node_z,
+        mode='markers',
+        hoverinfo='text',
+        marker=dict(
+            color=node_colors,  # projects and donors get their own colors
+            size=node_sizes,
+            opacity=1,
+            sizemode='diameter'
+        ))
+
+
+    # Prepare text information for hovering
+    node_trace.text = [f'{name}: {adj} connections' for name, adj in zip(node_names, degrees)]
+
+    # Create the figure
+    fig = go.Figure(data=[edge_trace, node_trace],
+                    layout=go.Layout(
+                        title=dict(text='3D Network graph of voters and grants', font=dict(size=20)),
+                        showlegend=False,
+                        hovermode='closest',
+                        margin=dict(b=20,l=5,r=5,t=40),
+                        annotations=[ dict(
+                            showarrow=False,
+                            text="This graph shows the connections between voters and grants based on donation data.",
+                            xref="paper",
+                            yref="paper",
+                            x=0.005,
+                            y=-0.002 )],
+                        scene = dict(
+                            xaxis_title='X Axis',
+                            yaxis_title='Y Axis',
+                            zaxis_title='Z Axis')))
+                        
+
+    return fig
@@ -0,0 +1,245 @@
+import os
+import hashlib
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2 as pg
+from psycopg2 import pool as pg_pool
+
+
+pool_max_size = int(os.environ.get('DB_POOL_MAX_SIZE', 8))
+pool_timeout = float(os.environ.get('DB_POOL_TIMEOUT', 30))  # seconds to wait for a free connection
+pool_max_lifetime = float(os.environ.get('DB_POOL_MAX_LIFETIME', 1800))  # recycle connections after 30 minutes
+pool_check_idle_after = float(os.environ.get('DB_POOL_CHECK_IDLE_AFTER', 30))  # ping connections idle longer than this
+
+
+def get_db_config(database):
+    """Build the psycopg2 connection arguments for 'grants' or 'indexer' from the environment."""
+    prefix = database.upper()
+    return {
+        'host': os.environ[f'{prefix}_DB_HOST'],
+        'port': os.environ[f'{prefix}_DB_PORT'],
+        'dbname': os.environ[f'{prefix}_DB_NAME'],
+        'user': os.environ[f'{prefix}_DB_USERNAME'],
+        'password': os.environ[f'{prefix}_DB_PASSWORD']
+    }
+
+
+class PooledConnection(pg.extensions.connection):
+    """
+    psycopg2 connection that remembers when it was opened and last handed back to the pool,
+    and which server-side prepared statements exist in its session.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created_at = time.monotonic()
+        self.returned_at = self.created_at
+        self.prepared = set()
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of connections to a single database.
+
+    Callers block for up to `timeout` seconds when all `max_size` connections are checked out.
+    Connections are health-checked on checkout and replaced when closed, broken, or older
+    than `max_lifetime`.
+    """
+
+    def __init__(self, db_config, max_size=pool_max_size, timeout=pool_timeout,
+                 max_lifetime=pool_max_lifetime, check_idle_after=pool_check_idle_after):
+        self.db_config = db_config
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.check_idle_after = check_idle_after
+        self._idle = []
+        self._size = 0
+        self._cond = threading.Condition()
+        self.stats = {
+            'checkouts': 0,
+            'connections_opened': 0,
+            'connections_recycled': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+            'timeouts': 0,
+        }
+
+    def _open(self):
+        conn = pg.connect(connection_factory=PooledConnection, **self.db_config)
+        with self._cond:
+            self.stats['connections_opened'] += 1
+        return conn
+
+    def _is_healthy(self, conn):
+        if conn.closed:
+            return False
+        now = time.monotonic()
+        if now - conn.created_at > self.max_lifetime:
+            return False
+        if now - conn.returned_at > self.check_idle_after:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute('SELECT 1')
+                conn.rollback()
+            except pg.Error:
+                return False
+        return True
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except pg.Error:
+            pass
+        with self._cond:
+            self.stats['connections_recycled'] += 1
+
+    def getconn(self):
+        """Check out a healthy connection, waiting for one to be returned if the pool is full."""
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn = None
+                    break
+                remaining = self.timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    self.stats['timeouts'] += 1
+                    raise pg_pool.PoolError(f"Timed out after {self.timeout}s waiting for a database connection")
+                self._cond.wait(remaining)
+            waited = time.monotonic() - start
+            self.stats['checkouts'] += 1
+            self.stats['wait_time_total'] += waited
+            self.stats['wait_time_max'] = max(self.stats['wait_time_max'], waited)
+
+        try:
+            if conn is not None and not self._is_healthy(conn):
+                self._discard(conn)
+                conn = None
+            if conn is None:
+                conn = self._open()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        return conn
+
+    def putconn(self, conn, discard=False):
+        """Return a connection to the pool, closing it instead if it is broken or `discard` is set."""
+        if not discard and not conn.closed:
+            try:
+                conn.rollback()  # never hand out a connection with an open transaction
+            except pg.Error:
+                discard = True
+        if discard or conn.closed:
+            self._discard(conn)
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            return
+        conn.returned_at = time.monotonic()
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        conn = self.getconn()
+        try:
+            yield conn
+        except (pg.OperationalError, pg.InterfaceError):
+            self.putconn(conn, discard=True)
+            raise
+        except BaseException:
+            self.putconn(conn)
+            raise
+        else:
+            self.putconn(conn)
+
+    def closeall(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for conn in idle:
+            self._discard(conn)
+
+    def get_stats(self):
+        with self._cond:
+            stats = dict(self.stats)
+            stats['size'] = self._size
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self._size - len(self._idle)
+        stats['wait_time_avg'] = stats['wait_time_total'] / stats['checkouts'] if stats['checkouts'] else 0.0
+        return stats
+
+
+_placeholder_pattern = re.compile(r'%\((\w+)\)s')
+
+
+def execute_prepared(conn, query, params):
+    """
+    Run a query with %(name)s placeholders as a server-side prepared statement.
+
+    The statement is prepared once per connection under a name derived from the SQL text,
+    so every later call with the same SQL, from any session, reuses the parsed statement
+    and its cached plan. Parameters are always sent as bound values.
+
+    :param conn: Connection from the pool
+    :param query: SQL with %(name)s placeholders
+    :param params: Dict of parameter values
+    :return: Cursor positioned on the results
+    """
+    names = list(dict.fromkeys(_placeholder_pattern.findall(query)))
+    statement = 'stmt_' + hashlib.sha1(query.encode()).hexdigest()[:16]
+    cur = conn.cursor()
+
+    def execute():
+        if statement not in conn.prepared:
+            sql = _placeholder_pattern.sub(lambda m: f'${names.index(m.group(1)) + 1}', query)
+            cur.execute(f'PREPARE {statement} AS {sql}')
+            conn.prepared.add(statement)
+        placeholders = ', '.join(['%s'] * len(names))
+        cur.execute(f'EXECUTE {statement} ({placeholders})' if names else f'EXECUTE {statement}',
+                    [params[name] for name in names])
+
+    try:
+        execute()
+    except (pg.errors.InvalidSqlStatementName, pg.errors.DuplicatePreparedStatement):
+        # The session's statements got out of sync with what we recorded (e.g. after DISCARD ALL); start over
+        conn.rollback()
+        cur.execute('DEALLOCATE ALL')
+        conn.prepared.clear()
+        execute()
+    return cur
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(database):
+    """Return the shared pool for 'grants' or 'indexer', creating it on first use."""
+    with _pools_lock:
+        if database not in _pools:
+            _pools[database] = ConnectionPool(get_db_config(database))
+        return _pools[database]
+
+
+def connection(database='grants'):
+    """Context manager yielding a pooled connection to `database`."""
+    return get_pool(database).connection()
+
+
+def pool_stats():
+    """Return a dict of pool counters (checkouts, wait times, recycled connections, ...) per database."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {database: pool.get_stats() for database, pool in pools.items()}
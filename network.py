@@ -0,0 +1,220 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse.linalg import eigsh, ArpackError, ArpackNoConvergence
+
+
+exact_repulsion_max_nodes = 500  # below this, repulsion is computed between every pair of nodes (O(n^2) per iteration)
+repulsion_samples = 16  # partners sampled per node and iteration for larger graphs
+
+
+def bipartite_edges(left, right):
+    """
+    Index a bipartite edge list the way a networkx Graph would store it.
+
+    Nodes are numbered in the order networkx adds them when the graph is built from the unique
+    `left` names followed by the unique `right` names. Repeated edges are dropped and the rest are
+    ordered as Graph.edges() yields them: by left-hand node, then by first appearance.
+
+    :param left: Sequence of left-hand node names (e.g. donors), one per edge
+    :param right: Sequence of right-hand node names (e.g. projects), one per edge
+    :return: (node_names, src, dst) with node_names an object array and src/dst edge index arrays
+    """
+    left = np.asarray(left, dtype=object)
+    right = np.asarray(right, dtype=object)
+    codes, node_names = pd.factorize(np.concatenate([left, right]))
+    src = codes[:len(left)].astype(np.int64)
+    dst = codes[len(left):].astype(np.int64)
+    _, first = np.unique(src * len(node_names) + dst, return_index=True)
+    first.sort()
+    order = first[np.argsort(src[first], kind='stable')]
+    return np.asarray(node_names, dtype=object), src[order], dst[order]
+
+
+def node_degrees(src, dst, n_nodes):
+    """Number of edges at each node."""
+    return np.bincount(src, minlength=n_nodes) + np.bincount(dst, minlength=n_nodes)
+
+
+def edge_coordinates(pos, src, dst):
+    """
+    Line coordinates for drawing every edge in a single Plotly trace.
+
+    :param pos: (n_nodes, dim) array of node positions
+    :return: (3 * n_edges, dim) array holding each edge's two end points followed by a NaN row,
+        which Plotly treats as a gap between lines
+    """
+    coords = np.full((len(src), 3, pos.shape[1]), np.nan)
+    coords[:, 0] = pos[src]
+    coords[:, 1] = pos[dst]
+    return coords.reshape(-1, pos.shape[1])
+
+
+def _adjacency(src, dst, n_nodes):
+    data = np.ones(len(src), dtype=np.float64)
+    adjacency = sp.coo_matrix((data, (src, dst)), shape=(n_nodes, n_nodes)).tocsr()
+    adjacency = adjacency + adjacency.T
+    adjacency.data[:] = 1.0  # collapse duplicate edges
+    return adjacency
+
+
+def spectral_positions(src, dst, n_nodes, dim=3, seed=42):
+    """
+    Initial positions from the leading non-trivial eigenvectors of the normalized adjacency matrix,
+    scaled into the unit cube. Falls back to random positions for tiny or badly conditioned graphs.
+    """
+    rng = np.random.default_rng(seed)
+    if n_nodes <= dim + 2:
+        return rng.random((n_nodes, dim))
+    adjacency = _adjacency(src, dst, n_nodes)
+    degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    d_inv_sqrt = sp.diags(1.0 / np.sqrt(np.maximum(degree, 1)))
+    normalized = d_inv_sqrt @ adjacency @ d_inv_sqrt
+    try:
+        _, vectors = eigsh(normalized, k=dim + 1, which='LA', tol=1e-3, maxiter=n_nodes * 5,
+                           v0=rng.random(n_nodes))
+    except (ArpackError, ArpackNoConvergence):
+        return rng.random((n_nodes, dim))
+    # eigsh returns ascending eigenvalues: drop the trivial top one, and rescale the
+    # symmetric eigenvectors by D^-1/2 to get those of the random-walk matrix
+    coords = vectors[:, :-1][:, ::-1] / np.sqrt(np.maximum(degree, 1))[:, None]
+    span = coords.max(axis=0) - coords.min(axis=0)
+    coords = (coords - coords.min(axis=0)) / np.where(span > 0, span, 1)
+    # Nodes in small disconnected components collapse onto one point; jitter them apart
+    return coords + rng.normal(scale=0.01, size=coords.shape)
+
+
+def _repulsion(pos, k, rng):
+    n = len(pos)
+    force = np.zeros_like(pos)
+    if n <= exact_repulsion_max_nodes:
+        # Exact pairwise forces, in row chunks to bound memory
+        chunk = max(1, 2_000_000 // max(n, 1))
+        for start in range(0, n, chunk):
+            delta = pos[start:start + chunk, None, :] - pos[None, :, :]
+            dist2 = np.maximum(np.einsum('ijk,ijk->ij', delta, delta), 1e-4)
+            force[start:start + chunk] = np.einsum('ijk,ij->ik', delta, k * k / dist2)
+        return force
+    # Monte Carlo estimate: sample partners per node and scale up to all n - 1 pairs
+    partners = rng.integers(0, n, size=(n, repulsion_samples))
+    delta = pos[:, None, :] - pos[partners]
+    dist2 = np.maximum(np.einsum('ijk,ijk->ij', delta, delta), 1e-4)
+    force = np.einsum('ijk,ij->ik', delta, k * k / dist2)
+    return force * ((n - 1) / repulsion_samples)
+
+
+def _attraction(pos, src, dst, k):
+    delta = pos[dst] - pos[src]
+    dist = np.sqrt(np.einsum('ij,ij->i', delta, delta))
+    pull = delta * (dist / k)[:, None]
+    force = np.empty_like(pos)
+    for axis in range(pos.shape[1]):
+        force[:, axis] = (np.bincount(src, weights=pull[:, axis], minlength=len(pos))
+                          - np.bincount(dst, weights=pull[:, axis], minlength=len(pos)))
+    return force
+
+
+def force_layout(src, dst, n_nodes, dim=3, k=None, iterations=50, initial=None, seed=42):
+    """
+    Fruchterman-Reingold force-directed layout on edge index arrays.
+
+    Follows networkx.spring_layout (same force model, linear cooling and final rescale
+    to [-1, 1]) but runs on NumPy arrays. Attraction is summed per edge; repulsion is exact for
+    small graphs and estimated from `repulsion_samples` random partners per node for large ones,
+    so an iteration costs O(edges + nodes) instead of O(nodes^2).
+
+    :param src: Array of edge source node indices
+    :param dst: Array of edge target node indices
+    :param n_nodes: Number of nodes; nodes are 0 .. n_nodes - 1
+    :param k: Optimal distance between nodes (default 1/sqrt(n_nodes), as in networkx)
+    :param iterations: Number of cooling steps
+    :param initial: Optional (n_nodes, dim) starting positions in the unit cube (see warm_start_positions);
+        when given, the spectral initialization is skipped and the layout starts cooler
+    :param seed: Seed for the initialization and repulsion sampling
+    :return: Array of shape (n_nodes, dim) with coordinates in [-1, 1]
+    """
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    if n_nodes == 0:
+        return np.zeros((0, dim))
+    rng = np.random.default_rng(seed)
+    k = k or 1.0 / np.sqrt(n_nodes)
+
+    if initial is None:
+        pos = spectral_positions(src, dst, n_nodes, dim=dim, seed=seed)
+        temperature = 0.1
+    else:
+        pos = np.array(initial, dtype=np.float64)
+        temperature = 0.02  # already close to equilibrium; only settle the new nodes
+    cooling = temperature / (iterations + 1)
+
+    for _ in range(iterations):
+        displacement = _repulsion(pos, k, rng) + _attraction(pos, src, dst, k)
+        length = np.sqrt(np.einsum('ij,ij->i', displacement, displacement))
+        length = np.where(length < 0.01, 0.1, length)
+        pos += displacement * (temperature / length)[:, None]
+        temperature -= cooling
+
+    return rescale(pos)
+
+
+def rescale(pos, scale=1.0):
+    """Center positions on the origin and scale them so the largest coordinate is `scale`."""
+    pos = pos - pos.mean(axis=0)
+    extent = np.abs(pos).max()
+    return pos * (scale / extent) if extent > 0 else pos
+
+
+def warm_start_positions(node_names, src, dst, previous, seed=42):
+    """
+    Starting positions for `node_names` from an earlier layout.
+
+    Nodes found in `previous` (dict of name -> coordinates in [-1, 1]) keep their place; new
+    nodes start at the mean of their already-placed neighbours, or at random if they have none.
+    Positions are mapped into the unit cube that force_layout expects.
+
+    :return: (n_nodes, dim) array, or None if no node of `node_names` is in `previous`
+    """
+    rng = np.random.default_rng(seed)
+    n_nodes = len(node_names)
+    dim = len(next(iter(previous.values()))) if previous else 3
+    known = np.array([name in previous for name in node_names], dtype=bool)
+    if not known.any():
+        return None
+    pos = rng.random((n_nodes, dim))
+    pos[known] = (np.array([previous[name] for name, k in zip(node_names, known) if k]) + 1) / 2
+
+    # Place unknown nodes next to their known neighbours
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    ends = np.concatenate([src, dst])
+    others = np.concatenate([dst, src])
+    usable = ~known[ends] & known[others]
+    counts = np.bincount(ends[usable], minlength=n_nodes)
+    has_neighbour = counts > 0
+    for axis in range(dim):
+        sums = np.bincount(ends[usable], weights=pos[others[usable], axis], minlength=n_nodes)
+        pos[has_neighbour, axis] = sums[has_neighbour] / counts[has_neighbour]
+    pos[~known] += rng.normal(scale=0.01, size=(int((~known).sum()), dim))
+    return pos
+
+
+def layout_positions(layout, node_names, src, dst, seed=42):
+    """
+    Coordinates of `node_names` in a computed layout.
+
+    Nodes missing from `layout`, such as donors to a live round that arrived after it was
+    computed, are placed next to their neighbours as in warm_start_positions.
+
+    :param layout: Frame of node, x, y, z as returned by utils.get_network_layout
+    :return: (n_nodes, 3) array with coordinates in [-1, 1] and no NaN
+    """
+    columns = ['x', 'y', 'z']
+    pos = layout.set_index('node').reindex(node_names)[columns].to_numpy(dtype=float, copy=True)  # cached layouts are read-only
+    missing = np.isnan(pos).any(axis=1)
+    if missing.any():
+        start = warm_start_positions(node_names, src, dst, dict(zip(layout['node'], layout[columns].to_numpy())), seed)
+        if start is None:
+            start = np.random.default_rng(seed).random(pos.shape)
+        pos[missing] = start[missing] * 2 - 1
+    return pos
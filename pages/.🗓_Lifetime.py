@@ -4,12 +4,18 @@ import numpy as np
 import plotly.graph_objs as go
 import plotly.express as px
 import utils 
+import warmup
+import perf
 
 st.set_page_config(
     page_title="Data - Gitcoin Stats",
     page_icon="assets/favicon.png",
     layout="wide",
 )
+
+perf.start_page('Lifetime')
+# Keep every program's cache warm in the background (starts once per server)
+warmup.start()
 #st.image('657c7ed16b14af693c08b92d_GTC-Logotype-Dark.png', width = 300)
 st.title('📈 Lifetime Stats')
 
@@ -17,8 +23,14 @@ st.title('📈 Lifetime Stats')
 st.write('')
 
 
-cf = utils.run_query("queries/get_summary_stats.sql", is_file=True)
-round_df = utils.run_query("queries/get_round_stats.sql", is_file=True)
+# The summary components and the round stats are independent, so fetch them side by side
+stats = utils.run_in_parallel({
+    'cf': (utils.get_summary_stats,),
+    'round_df': (utils.run_query, "queries/get_round_stats.sql", None, 'grants', True),
+})
+cf = stats['cf']
+round_df = stats['round_df']
+perf.mark('data load')
 st.subheader('Summary Stats')
 st.write(cf)
 st.subheader('Round Stats')
@@ -33,7 +45,7 @@ col1.metric(label="Funds Distributed", value='${:,.0f}'.format(cf['crowdfunded_u
 #col1.metric(label="Total Unique Grants", value='{:,.0f}'.format(cf['unique_grantees'][0] + af['unique_grantees'][0]))
 col3.metric(label="Total Donations", value='{:,.0f}'.format(cf['num_donations'][0]) )
 #col3.metric(label="Total Unique Voters", value='{:,.0f}'.format(cf['unique_voters'][0] + af['unique_voters'][0] ))
-col2.metric(label="Number of Matching Pools Paid Out", value='{:,.0f}'.format(cf['num_rounds'][0]))
+col2.metric(label="Number of Matching Pools Paid Out", value='{:,.0f}'.format(cf['total_rounds'][0]))
 
 #st.write(round_df)
 
@@ -59,6 +71,8 @@ y_axis_column = st.selectbox('Select Y-Axis', filtered_columns)
 # Create a bar graph with round_num on the x-axis and the selected column on the y-axis
 fig = px.bar(round_df, x='Program Number', y=y_axis_column)
 fig.update_traces(texttemplate='%{y:.2s}', textposition='outside')
+perf.mark('figure build')
+perf.figure('round stats', fig)
 st.plotly_chart(fig, use_container_width=True)
 
-
+perf.render_panel()
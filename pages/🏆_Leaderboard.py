@@ -4,6 +4,8 @@ import numpy as np
 import plotly.graph_objs as go
 import plotly.express as px
 import utils 
+import warmup
+import perf
 
 st.set_page_config(
     page_title="Data - Gitcoin Leaderboard",
@@ -11,6 +13,10 @@ st.set_page_config(
     layout="wide",
 )
 
+perf.start_page('Leaderboard')
+# Keep every program's cache warm in the background (starts once per server)
+warmup.start()
+
 st.title('🏆 Donor Leaderboard')
 st.write("This leaderboard shows the top donors by amount donated, and number of unique grants donated to. It's one way to see who's been the most generous and who's been the most loving.")
 
@@ -32,40 +38,18 @@ else:
     dfp, dfr, unique_donors, hourly_contributions = utils.load_round_data(program_option, dfr)
     data_load_state.text("")
 
-# Get votes data for the selected program
-round_chain_pairs = [
-    (str(row['round_id']).lower(), str(row['chain_id'])) 
-    for _, row in dfr.iterrows()
-]
-votes_by_voter_and_project = utils.get_voters_by_project(round_chain_pairs)
-
-# Group by voter to get total donations and unique grants
-dfv_grouped = votes_by_voter_and_project.groupby(['voter_id']).agg({
-    'amountUSD': 'sum',
-    'project_name': 'nunique'
-}).reset_index()
-
-dfv_grouped.columns = ['Voter ID', 'Amount USD', 'Unique Grants']
-dfv_grouped = dfv_grouped.sort_values('Amount USD', ascending=False)
-dfv_grouped['Amount USD'] = dfv_grouped['Amount USD'].apply(lambda x: "${:,.2f}".format(x))
-dfv_grouped['Unique Grants'] = dfv_grouped['Unique Grants'].astype(int)
+# Get the top donors of the selected program, ranked in the database
+leaderboard = utils.load_donor_leaderboard(dfr)
+perf.mark('data load')
 
-# For Most Generous ranking
-# Convert Amount USD back to numeric by removing $ and , before sorting
-dfv_generous = dfv_grouped.copy()
-dfv_generous['Amount USD'] = dfv_generous['Amount USD'].str.replace('$', '').str.replace(',', '').astype(float)
-dfv_generous = dfv_generous.sort_values('Amount USD', ascending=False)
-dfv_generous['Amount USD'] = dfv_generous['Amount USD'].apply(lambda x: "${:,.2f}".format(x))
-dfv_generous = dfv_generous[['Voter ID', 'Amount USD']].copy()
-dfv_generous.insert(0, 'Rank', range(1, len(dfv_generous) + 1))
+# Most Generous and Most Loving rankings
+dfv_generous, dfv_loving = utils.format_donor_leaderboard(leaderboard)
 
 st.subheader('💸 Most Generous')
-st.dataframe(dfv_generous.head(100), hide_index=True, use_container_width=True)
-
-# For Most Loving ranking
-dfv_loving = dfv_grouped.sort_values('Unique Grants', ascending=False)
-dfv_loving = dfv_loving[['Voter ID', 'Unique Grants']].copy()
-dfv_loving.insert(0, 'Rank', range(1, len(dfv_loving) + 1))
+st.dataframe(dfv_generous, hide_index=True, use_container_width=True)
 
 st.subheader('😘 Most Loving')
-st.dataframe(dfv_loving.head(100), hide_index=True, use_container_width=True)
\ No newline at end of file
+st.dataframe(dfv_loving, hide_index=True, use_container_width=True)
+perf.mark('leaderboard')
+
+perf.render_panel()
@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+
+perf_log_enabled = os.environ.get('PERF_LOG', '').lower() in ('1', 'true')  # structured logs on stdout
+perf_panel_enabled = os.environ.get('PERF_PANEL', '').lower() in ('1', 'true')  # debug panel on every page, for every visitor
+session_event_limit = 500
+session_limit = 200
+
+_sessions = OrderedDict()  # session id -> {'page', 'fragment', 'started', 'last_mark', 'events'}
+_sessions_lock = threading.Lock()
+_stats_providers = OrderedDict()  # name -> function returning a dict of counters
+
+
+def _session_id():
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else None
+
+
+def _session(session_id):
+    session = _sessions.get(session_id)
+    if session is None:
+        now = time.perf_counter()
+        session = _sessions[session_id] = {'page': None, 'fragment': None, 'started': now, 'last_mark': now,
+                                           'events': deque(maxlen=session_event_limit)}
+        while len(_sessions) > session_limit:
+            _sessions.popitem(last=False)
+    _sessions.move_to_end(session_id)
+    return session
+
+
+def log(event, **fields):
+    """
+    Record a performance event.
+
+    Events are printed as one JSON object per line, prefixed with "perf", and kept for
+    the current session's debug panel when called from a session (or one of its workers).
+    """
+    record = {'event': event, 'ts': round(time.time(), 3), **fields}
+    session_id = _session_id()
+    if session_id is not None:
+        record['session'] = session_id[:8]
+        with _sessions_lock:
+            _session(session_id)['events'].append(record)
+    if perf_log_enabled:
+        print('perf ' + json.dumps(record, default=str))
+
+
+def start_page(page):
+    """Start timing a page run; call right after st.set_page_config."""
+    session_id = _session_id()
+    if session_id is None:
+        return
+    with _sessions_lock:
+        session = _session(session_id)
+        session['page'] = page
+        session['fragment'] = None
+        session['started'] = session['last_mark'] = time.perf_counter()
+        session['events'].clear()
+
+
+def start_fragment(fragment):
+    """
+    Start timing a fragment; call first thing in an st.fragment function.
+
+    A fragment can rerun on its own, long after the page's last mark, so its first stage
+    is timed from here instead. Its stages are logged with the page name plus `fragment`.
+    When only the fragment reruns, the debug panel shows just that rerun, so call
+    render_panel at the end of the fragment.
+    """
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return
+    with _sessions_lock:
+        session = _session(ctx.session_id)
+        session['last_mark'] = time.perf_counter()
+        session['fragment'] = fragment
+        if ctx.fragment_ids_this_run:  # a fragment-only rerun, not part of a full page run
+            session['started'] = session['last_mark']
+            session['events'].clear()
+
+
+def mark(stage, **fields):
+    """Record that a render stage of the page finished, timed from the previous mark (or page start)."""
+    session_id = _session_id()
+    if session_id is None:
+        return
+    now = time.perf_counter()
+    with _sessions_lock:
+        session = _session(session_id)
+        elapsed, session['last_mark'] = now - session['last_mark'], now
+        page = session['page'] if not session.get('fragment') else f"{session['page']}/{session['fragment']}"
+    log('stage', page=page, stage=stage, ms=round(elapsed * 1000, 1), **fields)
+
+
+def figure(name, fig):
+    """
+    Record the size of a Plotly figure's JSON payload.
+
+    Serializing a figure costs about as much as sending it, so this only runs while the
+    debug panel is shown.
+    """
+    if panel_enabled():
+        log('figure', name=name, payload_bytes=len(fig.to_json()))
+
+
+def register_stats(name, provider):
+    """Show the counters returned by `provider()` in the debug panel under `name`."""
+    _stats_providers[name] = provider
+
+
+def enabled():
+    """Whether events are printed or shown in the debug panel; measurements costing real time can be skipped otherwise."""
+    return perf_log_enabled or panel_enabled()
+
+
+def panel_enabled():
+    """
+    Whether the debug panel is on: only with PERF_PANEL set in the environment.
+
+    The panel shows query names and cache internals, so it is never turned on from the page URL.
+    """
+    return perf_panel_enabled
+
+
+def render_panel():
+    """Show this run's stages, queries and figure sizes along with the registered counters, if enabled."""
+    if not panel_enabled():
+        return
+    ctx = get_script_run_ctx(suppress_warning=True)
+    with _sessions_lock:
+        session = _session(ctx.session_id) if ctx is not None else None
+        events = list(session['events']) if session else []
+        total = time.perf_counter() - session['started'] if session else 0.0
+    run = 'Fragment rerun' if ctx is not None and ctx.fragment_ids_this_run else 'Page run'
+    frames = {}
+    for event in ('stage', 'query', 'figure'):
+        rows = [{k: v for k, v in e.items() if k not in ('event', 'session', 'ts')} for e in events if e['event'] == event]
+        frames[event] = pd.DataFrame(rows)
+
+    with st.expander('⏱ Performance', expanded=True):
+        st.caption(f"{run} so far: {total * 1000:,.0f} ms")
+        st.subheader('Render stages')
+        st.dataframe(frames['stage'], hide_index=True, use_container_width=True)
+        st.subheader('Queries')
+        st.dataframe(frames['query'], hide_index=True, use_container_width=True)
+        if not frames['figure'].empty:
+            st.subheader('Figure payloads')
+            st.dataframe(frames['figure'], hide_index=True, use_container_width=True)
+        for name, provider in _stats_providers.items():
+            st.subheader(name)
+            try:
+                stats = provider()
+            except Exception as e:
+                st.write(f"Unavailable: {e}")
+                continue
+            if isinstance(stats, pd.DataFrame):
+                st.dataframe(stats, hide_index=True, use_container_width=True)
+            else:
+                st.json(stats)
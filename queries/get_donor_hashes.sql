@@ -0,0 +1,17 @@
+-- One 64-bit hash per distinct donor of each round, for building the per-round donor sketches.
+WITH round_chain_pairs AS (
+    SELECT 
+        unnest(%(round_ids)s::text[]) AS round_id,
+        unnest(%(chain_ids)s::text[]) AS chain_id
+)
+SELECT 
+    rcp.round_id,
+    rcp.chain_id,
+    ('x' || substr(md5(d.donor_address), 1, 16))::bit(64)::bigint AS donor_hash
+FROM 
+    public.donations AS d
+JOIN 
+    round_chain_pairs rcp 
+    ON d.round_id::text = rcp.round_id 
+    AND d.chain_id::text = rcp.chain_id
+GROUP BY 1, 2, 3
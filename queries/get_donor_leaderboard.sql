@@ -0,0 +1,36 @@
+-- Top donors of the selected rounds, ranked by total donated and by distinct projects supported.
+-- Returns every donor in either top list, with their rank in both.
+WITH round_chain_pairs AS (
+    SELECT 
+        unnest(%(round_ids)s::text[]) AS round_id,
+        unnest(%(chain_ids)s::text[]) AS chain_id
+),
+donor_totals AS (
+    SELECT
+        coalesce(ens.name, d.donor_address) AS "voter_id",
+        sum(d.amount_in_usd) AS "amountUSD",
+        count(DISTINCT (a.metadata->'application'->'project'->>'title')) AS "unique_grants"
+    FROM
+        public.donations d
+    JOIN round_chain_pairs rcp 
+        ON d.round_id::text = rcp.round_id 
+        AND d.chain_id::text = rcp.chain_id
+    LEFT JOIN public.applications a 
+        ON a.round_id = d.round_id 
+        AND a.id = d.application_id 
+        AND a.chain_id = d.chain_id
+    LEFT JOIN   "experimental_views"."ens_names_allo_donors_20241022231136" ens
+        ON d.donor_address = ens.address
+    GROUP BY 1
+),
+ranked AS (
+    SELECT
+        *,
+        row_number() OVER (ORDER BY "amountUSD" DESC, "voter_id") AS "generous_rank",
+        row_number() OVER (ORDER BY "unique_grants" DESC, "voter_id") AS "loving_rank"
+    FROM donor_totals
+)
+SELECT *
+FROM ranked
+WHERE "generous_rank" <= %(limit)s OR "loving_rank" <= %(limit)s
+ORDER BY "generous_rank"
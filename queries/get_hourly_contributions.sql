@@ -0,0 +1,21 @@
+-- since limits the scan to recent donations for incremental refreshes; pass '-infinity' to read all of them
+WITH round_chain_pairs AS (
+    SELECT 
+        unnest(%(round_ids)s::text[]) AS round_id,
+        unnest(%(chain_ids)s::text[]) AS chain_id
+)
+SELECT 
+    date_trunc('hour', timestamp) AS hour,
+    d.chain_id,
+    d.round_id,
+    token_address,
+    SUM(amount_in_usd) AS total_amount
+FROM 
+    public.donations AS d
+JOIN 
+    round_chain_pairs rcp 
+    ON d.round_id::text = rcp.round_id 
+    AND d.chain_id::text = rcp.chain_id
+WHERE d.timestamp >= %(since)s
+GROUP BY 1, 2, 3, 4
+ORDER BY 1, 2, 3, 4
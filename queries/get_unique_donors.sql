@@ -0,0 +1,13 @@
+WITH round_chain_pairs AS (
+    SELECT 
+        unnest(%(round_ids)s::text[]) AS round_id,
+        unnest(%(chain_ids)s::text[]) AS chain_id
+)
+SELECT 
+    count(distinct donor_address)
+FROM 
+    public.donations AS d
+JOIN 
+    round_chain_pairs rcp 
+    ON d.round_id::text = rcp.round_id 
+    AND d.chain_id::text = rcp.chain_id
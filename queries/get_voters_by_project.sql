@@ -0,0 +1,25 @@
+WITH round_chain_pairs AS (
+    SELECT 
+        unnest(%(round_ids)s::text[]) AS round_id,
+        unnest(%(chain_ids)s::text[]) AS chain_id
+)
+SELECT
+    (a.metadata->'application'->'project'->>'title') AS "project_name",
+    d.donor_address AS "voter",
+    coalesce(ens.name, d.donor_address) AS "voter_id",
+    sum(d.amount_in_usd) AS "amountUSD",
+    rcp.round_id,
+    rcp.chain_id
+FROM
+    public.donations d
+JOIN round_chain_pairs rcp 
+    ON d.round_id::text = rcp.round_id 
+    AND d.chain_id::text = rcp.chain_id
+LEFT JOIN public.applications a 
+    ON a.round_id = d.round_id 
+    AND a.id = d.application_id 
+    AND a.chain_id = d.chain_id
+LEFT JOIN   "experimental_views"."ens_names_allo_donors_20241022231136" ens
+    ON d.donor_address = ens.address
+GROUP BY 1, 2, 3, 5, 6
+ORDER BY 4 desc 
@@ -0,0 +1,5 @@
+SELECT 
+    SUM("amount_in_usd") AS other_gmv,
+    count(*) AS allo_rounds
+FROM "public"."AlloRoundsOutsideIndexer"
+WHERE timestamp <= CURRENT_TIMESTAMP
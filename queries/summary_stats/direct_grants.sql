@@ -0,0 +1,4 @@
+SELECT sum("amount_in_usd") as direct_grants_payouts,
+count(distinct (chain_id, round_id)) as direct_grant_rounds
+FROM "public"."applications_payouts"
+WHERE chain_id != 11155111
@@ -0,0 +1,8 @@
+SELECT
+    count(*) as num_donations,
+    count(distinct donor_address) as unique_voters,
+    count(distinct "recipient_address") as unique_grantees,
+    sum("amount_in_usd") as crowdfunded_usd,
+    max(timestamp) as last_donation,
+    COUNT(DISTINCT (donor_address, timestamp)) as transactions
+FROM all_donations
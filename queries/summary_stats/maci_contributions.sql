@@ -0,0 +1,4 @@
+SELECT sum(voice_credit_balance) / (100000) * 3000 as maci_crowdfunding,
+count(distinct (chain_id, round_id)) as maci_rounds
+FROM maci."contributions" mc
+WHERE mc.timestamp >= '2024-01-01' AND "chain_id" != 11155111
@@ -0,0 +1,4 @@
+SELECT
+    sum("match_amount_in_usd") + 1250000 as matchingfunds,
+    count(distinct "round_id") + 15 as matching_rounds
+FROM all_matching
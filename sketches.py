@@ -0,0 +1,63 @@
+import numpy as np
+
+
+precision = 14  # 2^14 registers of one byte each per sketch
+n_registers = 1 << precision
+relative_error = 1.04 / np.sqrt(n_registers)  # standard error of an estimate, about 0.8%
+
+_hash_bits = 64
+_rank_bits = _hash_bits - precision
+
+
+def _bit_length(values):
+    """Number of significant bits of each uint64, without going through floats."""
+    values = values.copy()
+    lengths = np.zeros(len(values), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        large = values >= (np.uint64(1) << np.uint64(shift))
+        lengths[large] += shift
+        values[large] >>= np.uint64(shift)
+    return lengths + (values > 0)
+
+
+def build(hashes):
+    """
+    HyperLogLog sketch of a set of 64-bit hashes.
+
+    The top `precision` bits of a hash pick a register, which keeps the highest rank
+    (position of the first set bit) seen among the remaining bits.
+
+    :param hashes: Array of 64-bit hashes (signed or unsigned), one per distinct item
+    :return: uint8 array of `n_registers` registers
+    """
+    hashes = np.asarray(hashes).astype(np.int64).view(np.uint64)
+    index = (hashes >> np.uint64(_rank_bits)).astype(np.int64)
+    rest = hashes & np.uint64((1 << _rank_bits) - 1)
+    rank = (_rank_bits - _bit_length(rest) + 1).astype(np.uint8)
+    registers = np.zeros(n_registers, dtype=np.uint8)
+    np.maximum.at(registers, index, rank)
+    return registers
+
+
+def merge(sketches):
+    """Sketch of the union of the sets behind `sketches`."""
+    merged = np.zeros(n_registers, dtype=np.uint8)
+    for registers in sketches:
+        np.maximum(merged, registers, out=merged)
+    return merged
+
+
+def estimate(registers):
+    """
+    Estimated number of distinct items in a sketch.
+
+    Uses linear counting while many registers are still empty, which is close to exact for
+    small sets, and the HyperLogLog estimate (standard error `relative_error`) above that.
+    """
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.sum(np.ldexp(1.0, -registers.astype(np.int64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if raw <= 2.5 * m and zeros:
+        return m * np.log(m / zeros)
+    return raw
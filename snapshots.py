@@ -0,0 +1,81 @@
+import json
+import os
+import re
+import shutil
+import threading
+import time
+
+import pandas as pd
+
+
+snapshot_dir = os.environ.get('SNAPSHOT_DIR', 'data/snapshots')
+snapshot_max_age = float(os.environ.get('SNAPSHOT_MAX_AGE', 86400))  # 1 day
+snapshot_keep_versions = int(os.environ.get('SNAPSHOT_KEEP_VERSIONS', 2))
+
+
+def _key_dir(key):
+    # Program names like "GG22" or "Citizens Round" become filesystem-safe folder names
+    return os.path.join(snapshot_dir, re.sub(r'[^A-Za-z0-9_.-]+', '_', str(key)))
+
+
+def load_snapshot(key, version, names, max_age=snapshot_max_age):
+    """
+    Load a set of DataFrames saved with save_snapshot.
+
+    :param key: Dataset key, e.g. the program name
+    :param version: Data version the snapshot must have been written for
+    :param names: Names of the frames to load
+    :param max_age: Maximum snapshot age in seconds
+    :return: Dict of name -> DataFrame, or None if there is no complete, fresh snapshot
+    """
+    path = os.path.join(_key_dir(key), version)
+    try:
+        with open(os.path.join(path, 'manifest.json'), 'r') as f:
+            manifest = json.load(f)
+        if time.time() - manifest['created_at'] > max_age:
+            return None
+        if not set(names) <= set(manifest['frames']):
+            return None
+        return {name: pd.read_parquet(os.path.join(path, f'{name}.parquet')) for name in names}
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Failed to read snapshot {path}. Error: {e}")
+        return None
+
+
+def save_snapshot(key, version, frames):
+    """
+    Write DataFrames to Parquet under `key`/`version`, replacing any previous snapshot of that version.
+
+    The manifest is written last and the folder is moved into place in one step,
+    so readers never see a partially written snapshot.
+    """
+    key_dir = _key_dir(key)
+    path = os.path.join(key_dir, version)
+    tmp_path = f'{path}.tmp-{os.getpid()}-{threading.get_ident()}'
+    try:
+        os.makedirs(tmp_path, exist_ok=True)
+        for name, df in frames.items():
+            df.to_parquet(os.path.join(tmp_path, f'{name}.parquet'), index=False)
+        with open(os.path.join(tmp_path, 'manifest.json'), 'w') as f:
+            json.dump({'created_at': time.time(), 'frames': list(frames)}, f)
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Failed to write snapshot {path}. Error: {e}")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        return
+    _prune(key_dir)
+
+
+def _prune(key_dir, keep=snapshot_keep_versions):
+    """Delete all but the `keep` most recently written versions of a dataset."""
+    versions = [
+        os.path.join(key_dir, name) for name in os.listdir(key_dir)
+        if '.tmp-' not in name and os.path.isfile(os.path.join(key_dir, name, 'manifest.json'))
+    ]
+    versions.sort(key=lambda p: os.path.getmtime(os.path.join(p, 'manifest.json')), reverse=True)
+    for old in versions[keep:]:
+        shutil.rmtree(old, ignore_errors=True)
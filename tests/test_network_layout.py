@@ -0,0 +1,76 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+# utils reads the database settings at import time; these tests never connect
+for prefix in ('GRANTS', 'INDEXER'):
+    for setting in ('HOST', 'PORT', 'NAME', 'USERNAME', 'PASSWORD'):
+        os.environ.setdefault(f'{prefix}_DB_{setting}', '')
+os.environ.setdefault('PERF_LOG', '0')
+
+import network
+import snapshots
+import utils
+
+
+@pytest.fixture
+def live_round(monkeypatch, tmp_path):
+    """A live round whose donor x project totals are refreshed by the test."""
+    monkeypatch.setattr(snapshots, 'snapshot_dir', str(tmp_path))
+    now = pd.Timestamp.now(tz='UTC')
+    dfr = pd.DataFrame({
+        'chain_id': ['10'], 'round_id': ['0xlive'], 'votes': [3], 'amountUSD': [30.0], 'uniqueContributors': [3],
+        'match_amount_in_usd': [1000.0], 'donations_start_time': [now - pd.Timedelta(days=1)],
+        'donations_end_time': [now + pd.Timedelta(days=1)],
+    })
+    state = {'votes': voters(['d1', 'd2', 'd3']), 'refreshed_at': 1}
+    monkeypatch.setattr(utils, 'load_voters_by_project', lambda dfr: state['votes'])
+    monkeypatch.setattr(utils, 'live_voters_refreshed_at', lambda dfr: state['refreshed_at'])
+    yield dfr, state
+    utils._layout_recent.clear()
+
+
+def voters(donors):
+    return pd.DataFrame({
+        'voter_id': donors,
+        'project_name': ['p1' if i % 2 else 'p2' for i in range(len(donors))],
+        'amountUSD': [10.0] * len(donors),
+    })
+
+
+def page_positions(votes, layout):
+    """Positions as the Networks page computes them."""
+    node_names, src, dst = network.bipartite_edges(votes['voter_id'], votes['project_name'])
+    return node_names, network.layout_positions(layout, node_names, src, dst)
+
+
+def test_live_layout_places_new_donors(live_round):
+    dfr, state = live_round
+    utils.get_network_layout(dfr, 5)
+
+    state['votes'] = voters(['d1', 'd2', 'd3', 'd4'])
+    state['refreshed_at'] = 2
+    layout = utils.get_network_layout(dfr, 5)
+
+    assert 'd4' in set(layout['node'])
+    node_names, pos = page_positions(state['votes'], layout)
+    assert len(node_names) == 6
+    assert not np.isnan(pos).any()
+
+
+def test_positions_of_nodes_missing_from_layout(live_round):
+    dfr, state = live_round
+    layout = utils.get_network_layout(dfr, 5)
+
+    # The page can see newer totals than the layout it was served
+    node_names, pos = page_positions(voters(['d1', 'd2', 'd3', 'd4', 'd5']), layout)
+
+    assert not np.isnan(pos).any()
+    assert np.abs(pos).max() <= 1 + 0.1
+    known = layout.set_index('node').loc[['d1', 'p1'], ['x', 'y', 'z']].to_numpy()
+    assert np.allclose(pos[[list(node_names).index('d1'), list(node_names).index('p1')]], known)
@@ -0,0 +1,62 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+# utils reads the database settings at import time; these tests never connect
+for prefix in ('GRANTS', 'INDEXER'):
+    for setting in ('HOST', 'PORT', 'NAME', 'USERNAME', 'PASSWORD'):
+        os.environ.setdefault(f'{prefix}_DB_{setting}', '')
+os.environ.setdefault('PERF_LOG', '0')
+
+import utils
+
+pairs = [('0xround', '10')]
+keys = ['hour', 'chain_id', 'round_id', 'token_address']
+
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    monkeypatch.chdir(root_dir)  # refresh_incremental reads its query file relative to the repository
+    utils._incremental_state.clear()
+    yield
+    utils._incremental_state.clear()
+
+
+def hourly_rows(hours, amount=1.0):
+    return pd.DataFrame({
+        'hour': pd.to_datetime(hours, utc=True),
+        'chain_id': 10,
+        'round_id': '0xround',
+        'token_address': '0xtoken',
+        'total_amount': amount,
+    })
+
+
+def refresh(monkeypatch, result):
+    monkeypatch.setattr(utils, 'execute_query', lambda *args, **kwargs: result)
+    return utils.refresh_incremental('hourly', pairs, "queries/get_hourly_contributions.sql", keys)
+
+
+def test_failed_first_query_returns_the_empty_result(monkeypatch):
+    df = refresh(monkeypatch, pd.DataFrame())
+    assert df.empty
+
+
+def test_failed_refresh_keeps_the_previous_aggregate(monkeypatch):
+    first = refresh(monkeypatch, hourly_rows(['2024-10-01 00:00', '2024-10-01 01:00', '2024-10-01 02:00']))
+    assert first['total_amount'].sum() == 3.0
+
+    df = refresh(monkeypatch, pd.DataFrame())
+    pd.testing.assert_frame_equal(df, first)
+
+
+def test_refresh_after_a_failure_picks_up_new_rows(monkeypatch):
+    refresh(monkeypatch, hourly_rows(['2024-10-01 00:00', '2024-10-01 01:00', '2024-10-01 02:00']))
+    refresh(monkeypatch, pd.DataFrame())
+    # The incremental query re-reads everything from the cutoff (01:00) onwards
+    df = refresh(monkeypatch, hourly_rows(['2024-10-01 01:00', '2024-10-01 02:00', '2024-10-01 03:00']))
+    assert df['total_amount'].sum() == 4.0
@@ -0,0 +1,339 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+import pandas as pd
+import requests
+
+import snapshots
+
+
+token_config_url = 'https://raw.githubusercontent.com/gitcoinco/grants-stack-indexer/main/src/config.ts'
+token_cache_dir = os.path.join(snapshots.snapshot_dir, 'tokens')
+token_fallback_path = 'data/token_map.csv'
+token_refresh_interval = 36000  # 10 hours between revalidations
+token_retry_interval = 300  # retry a failed fetch after 5 minutes
+token_fetch_timeout = float(os.environ.get('TOKEN_FETCH_TIMEOUT', 10))
+
+token_columns = [
+    'chain_id',
+    'chain_name',
+    'token_code',
+    'token_address',
+    'token_decimals',
+    'price_source_chain_id',
+    'price_source_address'
+]
+
+# Every alternative consumes its match without backtracking, so tokenizing is linear in the file size
+_ts_token_pattern = re.compile(r'''
+      (?P<comment>//[^\n]*|/\*(?:[^*]|\*(?!/))*\*/)
+    | (?P<string>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'|`(?:[^`\\]|\\.)*`)
+    | (?P<number>\d[\d_]*(?:\.\d+)?)
+    | (?P<name>[A-Za-z_$][\w$]*)
+    | (?P<punct>[{}\[\](),:])
+    | (?P<other>\S)
+''', re.VERBOSE)
+
+
+def _tokenize(text):
+    return [(m.lastgroup, m.group()) for m in _ts_token_pattern.finditer(text) if m.lastgroup != 'comment']
+
+
+class _LiteralReader:
+    """
+    Reads the object and array literals of a TypeScript file in a single pass over its tokens.
+
+    Strings and numbers become Python values; anything else (identifiers, calls, functions,
+    type annotations) is skipped and read as None.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self, offset=0):
+        pos = self.pos + offset
+        return self.tokens[pos] if pos < len(self.tokens) else (None, None)
+
+    def literals(self):
+        """Yield every top-level object or array literal in the file."""
+        while self.pos < len(self.tokens):
+            if self.peek()[1] in ('{', '['):
+                yield self.value()
+            else:
+                self.pos += 1
+
+    def value(self):
+        kind, text = self.peek()
+        if text == '{':
+            return self.object()
+        if text == '[':
+            return self.array()
+        if kind == 'string':
+            self.pos += 1
+            return text[1:-1]
+        if kind == 'number':
+            self.pos += 1
+            return int(text.replace('_', '')) if '.' not in text else float(text.replace('_', ''))
+        self.skip_expression()
+        return None
+
+    def object(self):
+        self.pos += 1
+        obj = {}
+        while self.pos < len(self.tokens):
+            kind, text = self.peek()
+            if text == '}':
+                self.pos += 1
+                break
+            if text in (',', ')', ']'):
+                self.pos += 1  # separators, or stray closers from skipped code
+            elif kind in ('name', 'string', 'number') and self.peek(1)[1] == ':':
+                self.pos += 2
+                obj[text.strip('"\'`')] = self.value()
+            else:
+                self.skip_expression()
+        return obj
+
+    def array(self):
+        self.pos += 1
+        items = []
+        while self.pos < len(self.tokens):
+            text = self.peek()[1]
+            if text == ']':
+                self.pos += 1
+                break
+            if text in (',', ')', '}'):
+                self.pos += 1
+            else:
+                items.append(self.value())
+        return items
+
+    def skip_expression(self):
+        """Advance to the next ',' or closing bracket outside the current expression."""
+        depth = 0
+        while self.pos < len(self.tokens):
+            text = self.peek()[1]
+            if text in ('{', '[', '('):
+                depth += 1
+            elif text in ('}', ']', ')'):
+                if depth == 0:
+                    return
+                depth -= 1
+            elif text == ',' and depth == 0:
+                return
+            self.pos += 1
+
+
+def _find_chains(value, chains):
+    if isinstance(value, dict):
+        if isinstance(value.get('id'), int) and isinstance(value.get('name'), str) and isinstance(value.get('tokens'), list):
+            chains.append(value)
+            return
+        for v in value.values():
+            _find_chains(v, chains)
+    elif isinstance(value, list):
+        for v in value:
+            _find_chains(v, chains)
+
+
+def parse_config_file(file_content):
+    """Parse the indexer's config.ts and extract token information, or return None if there is none."""
+    chains = []
+    for literal in _LiteralReader(_tokenize(file_content)).literals():
+        _find_chains(literal, chains)
+
+    data = []
+    for chain in chains:
+        for token in chain['tokens']:
+            if not isinstance(token, dict):
+                continue
+            price_source = token.get('priceSource') if isinstance(token.get('priceSource'), dict) else {}
+            if not all(isinstance(token.get(key), expected) for key, expected in [('code', str), ('address', str), ('decimals', int)]):
+                continue
+            if not (isinstance(price_source.get('chainId'), int) and isinstance(price_source.get('address'), str)):
+                continue
+            data.append([
+                chain['id'],
+                chain['name'],
+                token['code'],
+                token['address'],
+                token['decimals'],
+                price_source['chainId'],
+                price_source['address']
+            ])
+
+    if not data:
+        print("No token data found in the file.")
+        return None
+    df = pd.DataFrame(data, columns=token_columns)
+    df['token_address'] = df['token_address'].str.lower()
+    df['price_source_address'] = df['price_source_address'].str.lower()
+    return df
+
+
+def load_fallback_tokens(path=token_fallback_path):
+    """Token table from the bundled CSV of chain_id, token, token_symbol, with the other columns left empty."""
+    try:
+        df = pd.read_csv(path)
+    except Exception as e:
+        print(f"Failed to read {path}. Error: {e}")
+        return pd.DataFrame(columns=token_columns)
+    df = df.rename(columns={'token': 'token_address', 'token_symbol': 'token_code'})
+    df['token_address'] = df['token_address'].str.lower()
+    return df.reindex(columns=token_columns)
+
+
+class TokenRegistry:
+    """
+    Token table parsed from the indexer's config.ts, kept on disk and revalidated in the background.
+
+    get() never waits on GitHub. It serves the table in memory, else the copy saved by the last
+    successful fetch, else the bundled `token_fallback_path` CSV, and starts a background refresh
+    when the table is older than `refresh_interval`. Refreshes send the saved ETag and
+    Last-Modified validators, so an unchanged file costs a 304 response.
+
+    version() identifies the table get() currently serves, so anything derived from it can be
+    cached under that version and is rebuilt once the fallback is replaced by the real table.
+    """
+
+    def __init__(self, url=token_config_url, cache_dir=token_cache_dir, refresh_interval=token_refresh_interval,
+                 timeout=token_fetch_timeout):
+        self.url = url
+        self.cache_dir = cache_dir
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self._table = None
+        self._meta = {}  # etag, last_modified, checked_at (epoch seconds of the last successful check)
+        self._version = None  # (table, fingerprint) of the last table version() was asked for
+        self._loaded = False
+        self._refreshing = False
+        self._settled = threading.Event()  # set once a fetched table is available or the first fetch has finished
+        self._lock = threading.Lock()
+
+    @property
+    def _table_path(self):
+        return os.path.join(self.cache_dir, 'tokens.parquet')
+
+    @property
+    def _meta_path(self):
+        return os.path.join(self.cache_dir, 'tokens.json')
+
+    def _load_from_disk(self):
+        try:
+            with open(self._meta_path, 'r') as f:
+                meta = json.load(f)
+            table = pd.read_parquet(self._table_path)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Failed to read the saved token table. Error: {e}")
+            return
+        self._table, self._meta = table, meta
+
+    def _save_to_disk(self, table, meta):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            suffix = f'.tmp-{os.getpid()}-{threading.get_ident()}'
+            if table is not None:
+                table.to_parquet(self._table_path + suffix, index=False)
+                os.replace(self._table_path + suffix, self._table_path)
+            with open(self._meta_path + suffix, 'w') as f:
+                json.dump(meta, f)
+            os.replace(self._meta_path + suffix, self._meta_path)
+        except Exception as e:
+            print(f"Failed to save the token table. Error: {e}")
+
+    def get(self):
+        """Return the current token table, scheduling a background revalidation when it is due."""
+        table = self._current()
+        if table is None:
+            return load_fallback_tokens()
+        return table
+
+    def version(self):
+        """Short fingerprint of the table get() serves: 'fallback' for the bundled CSV, else a hash of its contents."""
+        table = self._current()
+        if table is None:
+            return 'fallback'
+        with self._lock:
+            if self._version is None or self._version[0] is not table:
+                hashes = pd.util.hash_pandas_object(table, index=False).values
+                self._version = (table, hashlib.sha1(hashes.tobytes()).hexdigest()[:12])
+            return self._version[1]
+
+    def _current(self):
+        """The fetched table, or None while only the fallback is available; schedules a revalidation when due."""
+        with self._lock:
+            if not self._loaded:
+                self._load_from_disk()
+                self._loaded = True
+                if self._table is not None:
+                    self._settled.set()
+            table = self._table
+            due = time.time() - self._meta.get('checked_at', 0) > self.refresh_interval
+            if due and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self._refresh_in_background, name='token-registry', daemon=True).start()
+        return table
+
+    def wait_until_settled(self, timeout=None):
+        """
+        Block until get() serves a fetched table, or until the first fetch has finished without one.
+
+        :return: Whether it settled within `timeout` seconds
+        """
+        self._current()  # loads the saved copy, or starts the first fetch
+        return self._settled.wait(timeout)
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        finally:
+            with self._lock:
+                self._refreshing = False
+            self._settled.set()
+
+    def refresh(self):
+        """Revalidate the table against GitHub, replacing it if the file changed. Returns whether it is current."""
+        with self._lock:
+            meta = dict(self._meta)
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+        try:
+            response = requests.get(self.url, headers=headers, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"Failed to fetch data from {self.url}. Error: {e}")
+            with self._lock:
+                # Keep serving what we have and try again after `token_retry_interval`
+                self._meta['checked_at'] = time.time() - self.refresh_interval + token_retry_interval
+            return False
+
+        table = None
+        if response.status_code != 304:
+            table = parse_config_file(response.text)
+            if table is None:
+                return False
+        meta = {
+            'etag': response.headers.get('ETag', meta.get('etag')),
+            'last_modified': response.headers.get('Last-Modified', meta.get('last_modified')),
+            'checked_at': time.time(),
+        }
+        with self._lock:
+            if table is not None:
+                self._table = table
+            self._meta = meta
+        self._save_to_disk(table, meta)
+        return True
+
+
+registry = TokenRegistry()
@@ -1,11 +1,19 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import psycopg2 as pg
 import os
 from typing import Union, Dict, List, Any
 from datetime import datetime, timezone
-import requests
-import re
+import hashlib
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from collections import OrderedDict
+from pandas.api.types import union_categoricals
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 
 try:
@@ -17,6 +25,14 @@ try:
 except ImportError:
     print("dotenv not installed, skipping .env file loading")
 
+import db  # reads pool settings from the environment, so import after .env is loaded
+import snapshots
+import cache
+import network
+import sketches
+import tokens
+import perf
+
 grants_db_host= os.environ['GRANTS_DB_HOST']
 grants_db_port = os.environ['GRANTS_DB_PORT']
 grants_db_name = os.environ['GRANTS_DB_NAME']
@@ -30,258 +46,682 @@ indexer_db_username = os.environ['INDEXER_DB_USERNAME']
 indexer_db_password = os.environ['INDEXER_DB_PASSWORD']
 
 time_to_live = 900  # 15 minutes
-
-@st.cache_resource(ttl=time_to_live)  # 15 minutes cache
-def run_query(query, params=None, database='grants', is_file=False):
+query_max_workers = int(os.environ.get('QUERY_MAX_WORKERS', 4))
+stream_batch_size = int(os.environ.get('QUERY_STREAM_BATCH_SIZE', 50000))
+live_refresh_interval = 60  # 1 minute, for rounds that are accepting donations
+watermark_overlap = pd.Timedelta(minutes=30)  # re-read recent donations to catch reorgs and late indexing
+historical_stats_ttl = 21600  # 6 hours, for lifetime totals that only change when rounds pay out
+bounties_distributed_usd = 11700000
+unique_donors_exact = os.environ.get('UNIQUE_DONORS_EXACT', '').lower() in ('1', 'true')  # count with SQL instead of sketches
+leaderboard_size = 100  # donors shown in each leaderboard ranking
+network_default_min_donation = 5  # the Networks page slider's initial value
+network_prewarm_rounds = int(os.environ.get('NETWORK_PREWARM_ROUNDS', 3))  # busiest rounds per program laid out in the background
+data_version_columns = ['chain_id', 'round_id', 'votes', 'amountUSD', 'uniqueContributors', 'match_amount_in_usd']  # round columns fingerprinted by get_data_version
+
+# Compact dtypes for the per-program datasets, applied as each frame is loaded.
+# Repeated strings become categoricals, counts narrow ints, and 'usd' amounts are rounded to cents.
+dataset_schemas = {
+    'dfp': {
+        'round_name': 'category',
+        'chain_id': 'category',
+        'round_id': 'category',
+        'status': 'category',
+        'votes': 'int32',
+        'amountUSD': 'usd',
+        'unique_donors_count': 'int32',
+    },
+    'hourly_contributions': {
+        'chain_id': 'int32',
+        'round_id': 'category',
+        'token_address': 'category',
+        'token_code': 'category',
+        'total_amount': 'usd',
+    },
+    'voters': {
+        'project_name': 'category',
+        'voter': 'category',
+        'voter_id': 'category',
+        'amountUSD': 'usd',
+        'round_id': 'category',
+        'chain_id': 'category',
+    },
+}
+
+# Components of the lifetime stats: name -> (query file, seconds to cache). Only the donation
+# totals move while rounds are live; the payout totals are refreshed rarely.
+summary_stats_components = {
+    'donation_stats': ("queries/summary_stats/donation_stats.sql", time_to_live),
+    'matching_stats': ("queries/summary_stats/matching_stats.sql", historical_stats_ttl),
+    'direct_grants': ("queries/summary_stats/direct_grants.sql", historical_stats_ttl),
+    'allo_rounds': ("queries/summary_stats/allo_rounds.sql", 3600),  # rounds are listed ahead of their date
+    'maci_contributions': ("queries/summary_stats/maci_contributions.sql", historical_stats_ttl),
+}
+
+query_flights = cache.SingleFlight()  # stats() counts the executions saved by coalescing
+_query_local = threading.local()  # per-thread count of executed queries, to tell coalesced calls apart
+_query_labels = {}  # SQL text -> query file it was read from
+
+_incremental_state = OrderedDict()  # (name, pairs) -> base aggregate, cutoff and recent rows, least recently used first
+_incremental_lock = threading.Lock()
+incremental_state_limit = 32  # live aggregates kept between refreshes
+
+_layout_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='network-layout')
+_layout_scheduled = set()
+_layout_recent = OrderedDict()  # round -> last layout computed for it, to warm-start the next filter
+_layout_lock = threading.Lock()
+
+_dataset_index = {}  # (dataset, round_id, chain_id) -> (round data version, loader, args) of a cached frame holding that round
+_dataset_index_lock = threading.Lock()
+
+def run_query(query, params=None, database='grants', is_file=False, prepared=False, stream=False, schema=None):
     """
-    Execute a SQL query and return the results as a DataFrame.
+    Execute a SQL query and return the results as a DataFrame, cached for `time_to_live` seconds.
+
+    Loaders that cache their own result call execute_query instead, so a frame is held
+    (and counted against the result cache budget) only once.
     
     :param query: SQL query string or filename containing the query
     :param params: Parameters for the SQL query (dict for named params, list for positional)
     :param database: Database to query ('grants' or 'indexer')
     :param is_file: Whether the query is a filename (True) or a SQL string (False)
+    :param prepared: Run as a server-side prepared statement (named %(name)s params only)
+    :param stream: Fetch through a server-side cursor in batches of `stream_batch_size` rows,
+        for results too large to buffer at once (cannot be combined with `prepared`)
+    :param schema: Dict of column -> compact dtype to apply to the result (see apply_schema)
     :return: DataFrame containing query results
     """
+    start = time.perf_counter()
+    df, state = _run_query_cached.with_state(query, params, database, is_file, prepared, stream, schema)
+    if state != 'miss':  # misses are logged by execute_query
+        size = _run_query_cached.stored_bytes(query, params, database, is_file, prepared, stream, schema) if perf.enabled() else None
+        log_query(query if is_file else query_label(query), database, 'hit' if state == 'fresh' else state,
+                  time.perf_counter() - start, df, size)
+    return df
+
+@cache.cached(ttl=time_to_live)  # 15 minutes cache
+def _run_query_cached(query, params, database, is_file, prepared, stream, schema):
     if is_file:
-        with open(query, 'r') as f:
-            query = f.read()
-    
-    db_config = {
-        'host': os.environ[f'{database.upper()}_DB_HOST'],
-        'port': os.environ[f'{database.upper()}_DB_PORT'],
-        'dbname': os.environ[f'{database.upper()}_DB_NAME'],
-        'user': os.environ[f'{database.upper()}_DB_USERNAME'],
-        'password': os.environ[f'{database.upper()}_DB_PASSWORD']
-    }
-    
+        query = read_query_file(query)
+    return execute_query(query, params=params, database=database, prepared=prepared, stream=stream, schema=schema)
+
+def execute_query(query, params=None, database='grants', prepared=False, stream=False, schema=None):
+    """
+    Execute a SQL string without caching the result (see run_query for the parameters).
+
+    Sessions asking for the same SQL and parameters on the same database while it is
+    running wait for that execution and share its result instead of running it again.
+    """
+    key = cache.make_key(execute_query, (database, query, params, prepared, stream, schema), {})
+    executions = getattr(_query_local, 'executions', 0)
+    start = time.perf_counter()
+    df = query_flights.do(key, _execute_query, query, params, database, prepared, stream, schema)
+    state = 'miss' if getattr(_query_local, 'executions', 0) > executions else 'coalesced'
+    log_query(query_label(query), database, state, time.perf_counter() - start, df)
+    return df
+
+def query_label(query):
+    """Short name of a SQL string for logs: its query file if it was read from one, else its start."""
+    return _query_labels.get(query) or ' '.join(query.split())[:60]
+
+def log_query(label, database, cache_state, seconds, df, size=None):
+    """Log a query with its result size: `size` bytes when known (e.g. from the cache), else measured."""
+    fields = {}
+    if size is not None:
+        fields['bytes'] = size
+    elif perf.enabled():  # measuring object columns deeply costs about as much as a cache hit, so only for executions
+        fields['bytes'] = int(df.memory_usage(deep=True).sum())
+    perf.log('query', label=label, database=database, cache=cache_state, ms=round(seconds * 1000, 1),
+             rows=len(df), **fields)
+
+def _execute_query(query, params, database, prepared, stream, schema):
+    _query_local.executions = getattr(_query_local, 'executions', 0) + 1
     try:
-        with pg.connect(**db_config) as conn:
-            if params:
+        with db.connection(database) as conn:
+            if stream:
+                return fetch_streaming(conn, query, params, schema=schema)
+            elif prepared:
+                cur = db.execute_prepared(conn, query, params or {})
+                df = pd.DataFrame.from_records(cur.fetchall(), columns=[c.name for c in cur.description], coerce_float=True)
+            elif params:
                 df = pd.read_sql_query(query, conn, params=params)
             else:
                 df = pd.read_sql_query(query, conn)
-        return df
+        return apply_schema(df, schema) if schema else df
     except pg.Error as e:
         st.error(f"Database error: {e}")
         return pd.DataFrame()  # Return empty DataFrame on error
 
-def parse_config_file(file_content):
-    """Parse the config file content and extract token information."""
-    data = []
-    chain_pattern = re.compile(r'{\s*id:\s*(\d+),\s*name:\s*"([^"]+)",.*?tokens:\s*\[(.*?)\].*?}', re.DOTALL)
-    token_pattern = re.compile(r'code:\s*"(?P<code>[^"]+)".*?address:\s*"(?P<address>[^"]+)".*?decimals:\s*(?P<decimals>\d+).*?priceSource:\s*{\s*chainId:\s*(?P<price_source_chain_id>\d+).*?address:\s*"(?P<price_source_address>[^"]+)"', re.DOTALL)
-    chain_matches = chain_pattern.findall(file_content)
-
-    for chain_match in chain_matches:
-        chain_id = int(chain_match[0])
-        chain_name = chain_match[1]
-        token_data = chain_match[2]
-
-        token_matches = token_pattern.finditer(token_data)
-
-        for token_match in token_matches:
-            token_code = token_match.group('code')
-            token_address = token_match.group('address')
-            token_decimals = int(token_match.group('decimals'))
-            price_source_chain_id = int(token_match.group('price_source_chain_id'))
-            price_source_address = token_match.group('price_source_address')
-
-            data.append([
-                chain_id,
-                chain_name,
-                token_code,
-                token_address,
-                token_decimals,
-                price_source_chain_id,
-                price_source_address
-            ])
-
-    if data:
-        columns = [
-            'chain_id',
-            'chain_name',
-            'token_code',
-            'token_address',
-            'token_decimals',
-            'price_source_chain_id',
-            'price_source_address'
-        ]
-        df = pd.DataFrame(data, columns=columns)
-        df['token_address'] = df['token_address'].str.lower()
-        df['price_source_address'] = df['price_source_address'].str.lower()
-        return df
-    else:
-        print("No token data found in the file.")
-        return None
-    
-@st.cache_resource(ttl=36000) #10 hours
+def fetch_streaming(conn, query, params=None, batch_size=None, schema=None):
+    """
+    Read a query's result through a named (server-side) cursor, building the DataFrame batch by batch.
+
+    Only one batch of raw rows is held in Python at a time instead of the whole result,
+    and each batch is converted to the compact `schema` dtypes before the next is read.
+    The converted batches are all kept until they are concatenated, so peak memory is
+    about twice the compact frame, instead of the raw rows of the whole result.
+    """
+    batch_size = batch_size or stream_batch_size
+    batches = []
+    with conn.cursor(name=f'stream_{uuid.uuid4().hex}') as cur:
+        cur.itersize = batch_size
+        cur.execute(query, params)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            batch = pd.DataFrame.from_records(rows, columns=[c.name for c in cur.description], coerce_float=True)
+            batches.append(apply_schema(batch, schema) if schema else batch)
+        columns = [c.name for c in cur.description] if cur.description else []
+    if not batches:
+        return pd.DataFrame(columns=columns)
+    return concat_batches(batches)
+
+def concat_batches(batches):
+    """Concatenate frames, keeping categorical columns categorical across batches with different categories."""
+    if len(batches) == 1:
+        return batches[0]
+    for column in batches[0].columns:
+        if isinstance(batches[0][column].dtype, pd.CategoricalDtype):
+            categories = union_categoricals([batch[column] for batch in batches]).categories
+            batches = [batch.assign(**{column: batch[column].cat.set_categories(categories)}) for batch in batches]
+    return pd.concat(batches, ignore_index=True)
+
+def apply_schema(df, schema):
+    """
+    Convert a loaded frame's columns to the compact dtypes declared in `schema`.
+
+    :param schema: Dict of column -> dtype; 'usd' means float64 rounded to cents. Columns
+        missing from the frame are skipped, and integer columns containing NULLs stay float.
+    """
+    converted = {}
+    for column, dtype in schema.items():
+        if column not in df.columns:
+            continue
+        if dtype == 'usd':
+            converted[column] = df[column].astype('float64').round(2)
+        elif dtype.startswith('int') and df[column].isna().any():
+            continue
+        else:
+            converted[column] = df[column].astype(dtype)
+    return df.assign(**converted)
+
+def memory_report(frames):
+    """
+    Summarize the size of each frame in a program's dataset.
+
+    :param frames: Dict of dataset name -> DataFrame
+    :return: DataFrame with rows, columns and deep memory use (MB) per dataset, plus a total row
+    """
+    report = pd.DataFrame([
+        {'dataset': name, 'rows': len(df), 'columns': df.shape[1], 'memory_mb': df.memory_usage(deep=True).sum() / 1024 ** 2}
+        for name, df in frames.items()
+    ])
+    total = pd.DataFrame([{'dataset': 'total', 'rows': report['rows'].sum(), 'columns': report['columns'].sum(), 'memory_mb': report['memory_mb'].sum()}])
+    return pd.concat([report, total], ignore_index=True).round({'memory_mb': 2})
+
+@lru_cache(maxsize=None)
+def read_query_file(path):
+    with open(path, 'r') as f:
+        query = f.read()
+    _query_labels[query] = path
+    return query
+
+def round_chain_params(round_chain_pairs, **params):
+    """Bind (round_id, chain_id) pairs as the %(round_ids)s / %(chain_ids)s array parameters."""
+    return {
+        'round_ids': [pair[0] for pair in round_chain_pairs],
+        'chain_ids': [pair[1] for pair in round_chain_pairs],
+        **params
+    }
+
 def fetch_tokens_config():
-    """Fetch and parse the token configuration from the GitHub repository."""
-    url = 'https://raw.githubusercontent.com/gitcoinco/grants-stack-indexer/main/src/config.ts'
-    
-    try:
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an error for bad responses
-    except requests.RequestException as e:
-        print(f"Failed to fetch data from {url}. Error: {e}")
-        return None
+    """
+    Token table (chain_id, token_code, token_address, ...) from the indexer's config.
 
-    df = parse_config_file(response.text)
+    Served by the token registry without waiting on GitHub; see tokens.TokenRegistry.
+    """
+    return tokens.registry.get()
+
+def tokens_config_version():
+    """Version of the token table fetch_tokens_config() serves now, 'fallback' until the real one is available."""
+    return tokens.registry.version()
+
+@cache.cached(ttl=time_to_live)
+def get_voters_by_project(round_chain_pairs, data_version=None):
+    if not round_chain_pairs:
+        st.error("No round_chain_pairs provided.")
+        return pd.DataFrame()  # Return an empty DataFrame if no pairs are provided
+
+    # With a data version the result can be served from, and saved to, the on-disk snapshots
+    if data_version is not None:
+        snapshot_key = 'voters-' + hashlib.sha1(repr(sorted(round_chain_pairs)).encode()).hexdigest()[:12]
+        snapshot = snapshots.load_snapshot(snapshot_key, data_version, ['voters'])
+        if snapshot is not None and {'round_id', 'chain_id'} <= set(snapshot['voters'].columns):
+            return apply_schema(snapshot['voters'], dataset_schemas['voters'])
+
+    # Large programs have hundreds of thousands of donor x project rows, so stream them in.
+    # Not through run_query: its cache is keyed by the SQL alone and could put rows from before
+    # the data version changed into this version's snapshot
+    df = execute_query(read_query_file("queries/get_voters_by_project.sql"), params=round_chain_params(round_chain_pairs),
+                       database='grants', stream=True, schema=dataset_schemas['voters'])
+    if data_version is not None and not df.empty:
+        snapshots.save_snapshot(snapshot_key, data_version, {'voters': df})
     return df
 
+@cache.cached(ttl=time_to_live)
+def get_donor_leaderboard(round_chain_pairs, limit=leaderboard_size, data_version=None):
+    """
+    Top `limit` donors of the rounds by amount donated and by number of projects supported.
+
+    The per-donor totals and both rankings are computed in the database, so only the
+    donors making either list are fetched.
 
-@st.cache_resource(ttl=time_to_live)
-def get_voters_by_project(round_chain_pairs):
+    :param data_version: Data version of the rounds; a new version bypasses the cached result
+    :return: Frame of voter_id, amountUSD, unique_grants, generous_rank and loving_rank
+    """
     if not round_chain_pairs:
         st.error("No round_chain_pairs provided.")
         return pd.DataFrame()  # Return an empty DataFrame if no pairs are provided
 
-    # Prepare the round_chain_pairs for the SQL query
-    round_ids = ', '.join(f"'{pair[0]}'" for pair in round_chain_pairs)
-    chain_ids = ', '.join(f"'{pair[1]}'" for pair in round_chain_pairs)
+    # Not through run_query: its cache is keyed by the SQL alone and would outlive the data version
+    return execute_query(read_query_file("queries/get_donor_leaderboard.sql"),
+                         params=round_chain_params(round_chain_pairs, limit=limit), database='grants', prepared=True)
+
+@cache.cached(ttl=live_refresh_interval, max_stale=live_refresh_interval)
+def get_live_donor_leaderboard(round_chain_pairs, limit=leaderboard_size):
+    """Donor leaderboard for a live round, recomputed every `live_refresh_interval` seconds."""
+    return execute_query(read_query_file("queries/get_donor_leaderboard.sql"),
+                         params=round_chain_params(round_chain_pairs, limit=limit), database='grants', prepared=True)
+
+def load_donor_leaderboard(dfr, limit=leaderboard_size):
+    """Donor leaderboard for the rounds in `dfr`, refreshed every minute while any of them is live."""
+    round_chain_pairs = get_round_chain_pairs(dfr)
+    if is_live(dfr):
+        return get_live_donor_leaderboard(round_chain_pairs, limit)
+    return get_donor_leaderboard(round_chain_pairs, limit, get_data_version(dfr))
+
+def format_donor_leaderboard(leaderboard, limit=leaderboard_size):
+    """
+    The Leaderboard page's two tables from a load_donor_leaderboard() frame.
+
+    :return: (most generous frame of Rank, Voter ID, Amount USD; most loving frame of Rank, Voter ID, Unique Grants)
+    """
+    generous = leaderboard[leaderboard['generous_rank'] <= limit].sort_values('generous_rank')
+    generous = pd.DataFrame({
+        'Rank': generous['generous_rank'].astype(int),
+        'Voter ID': generous['voter_id'],
+        'Amount USD': generous['amountUSD'].map("${:,.2f}".format),
+    })
+    loving = leaderboard[leaderboard['loving_rank'] <= limit].sort_values('loving_rank')
+    loving = pd.DataFrame({
+        'Rank': loving['loving_rank'].astype(int),
+        'Voter ID': loving['voter_id'],
+        'Unique Grants': loving['unique_grants'].astype(int),
+    })
+    return generous, loving
+
+# The program loaders below run uncached: get_program_data caches and snapshots their results
+# under the program's data version, which a cache keyed by the SQL alone would not respect
 
-    # Construct the SQL query with the formatted pairs
-    query = f"""
-    WITH round_chain_pairs AS (
-        SELECT 
-            unnest(ARRAY[{round_ids}]::text[]) AS round_id,
-            unnest(ARRAY[{chain_ids}]::text[]) AS chain_id
-    )
-    SELECT
-        (a.metadata->'application'->'project'->>'title') AS "project_name",
-        d.donor_address AS "voter",
-        coalesce(ens.name, d.donor_address) AS "voter_id",
-        sum(d.amount_in_usd) AS "amountUSD"
-    FROM
-        public.donations d
-    JOIN round_chain_pairs rcp 
-        ON d.round_id::text = rcp.round_id 
-        AND d.chain_id::text = rcp.chain_id
-    LEFT JOIN public.applications a 
-        ON a.round_id = d.round_id 
-        AND a.id = d.application_id 
-        AND a.chain_id = d.chain_id
-    LEFT JOIN   "experimental_views"."ens_names_allo_donors_20241022231136" ens
-        ON d.donor_address = ens.address
-    GROUP BY 1, 2, 3
-    ORDER BY 4 desc 
-    """
-
-    return run_query(query, database='grants', is_file=False)
-
-@st.cache_resource(ttl=time_to_live)
 def get_projects(round_chain_pairs):
     if not round_chain_pairs:
         st.error("No round_chain_pairs provided.")
         return pd.DataFrame()  # Return an empty DataFrame if no pairs are provided
 
-    # Prepare the round_chain_pairs for the SQL query
-    round_ids = ', '.join(f"'{pair[0]}'" for pair in round_chain_pairs)
-    chain_ids = ', '.join(f"'{pair[1]}'" for pair in round_chain_pairs)
-
-    # Construct the SQL query with the formatted pairs
-    query = f"""
-    WITH round_chain_pairs AS (
-        SELECT 
-            unnest(ARRAY[{round_ids}]::text[]) AS round_id,
-            unnest(ARRAY[{chain_ids}]::text[]) AS chain_id
-    )
-    SELECT 
-        a.id AS application_id,
-        (a.metadata->'application'->'project'->>'title') AS title,
-        (a.metadata->'application'->>'recipient') AS recipient_address,
-        (r."round_metadata" #>> '{{name}}')::text AS "round_name",
-        a.chain_id::text,
-        a.round_id::text,
-        a.project_id AS "projectId",
-        a.status,
-        a.total_donations_count AS votes,
-        a.total_amount_donated_in_usd AS "amountUSD",
-        a.unique_donors_count
-    FROM 
-        public.applications AS a
-    LEFT JOIN rounds r ON a.round_id = r.id AND a.chain_id = r.chain_id
-    JOIN 
-        round_chain_pairs rcp 
-        ON a.round_id::text = rcp.round_id 
-        AND a.chain_id::text = rcp.chain_id
-    WHERE 
-        a.status = 'APPROVED';
-    """
-
-    return run_query(query, database='grants', is_file=False)
+    return execute_query(read_query_file("queries/get_projects.sql"), params=round_chain_params(round_chain_pairs),
+                         database='grants', prepared=True, schema=dataset_schemas['dfp'])
 
 def get_unique_donors(round_chain_pairs):
-    round_ids = ', '.join(f"'{pair[0]}'" for pair in round_chain_pairs)
-    chain_ids = ', '.join(f"'{pair[1]}'" for pair in round_chain_pairs)
-
-    query = f"""
-    WITH round_chain_pairs AS (
-        SELECT 
-            unnest(ARRAY[{round_ids}]::text[]) AS round_id,
-            unnest(ARRAY[{chain_ids}]::text[]) AS chain_id
-    )
-    SELECT 
-        count(distinct donor_address)
-    FROM 
-        public.donations AS d
-    JOIN 
-        round_chain_pairs rcp 
-        ON d.round_id::text = rcp.round_id 
-        AND d.chain_id::text = rcp.chain_id
+    return execute_query(read_query_file("queries/get_unique_donors.sql"), params=round_chain_params(round_chain_pairs),
+                         database='grants', prepared=True)
+
+def get_donor_sketches(dfr):
     """
-    return run_query(query, database='grants', is_file=False)
+    HyperLogLog sketches of the donors of each round in `dfr` (see sketches.py).
+
+    Each round's sketch is saved as a snapshot under that round's data version, so only
+    rounds that received donations since are queried again, all in one query.
+
+    :return: Dict of (round_id, chain_id) -> sketch registers
+    :raises RuntimeError: If the donor query fails, rather than returning the sketches of only some rounds
+    """
+    round_sketches = {}
+    missing = {}
+    for i, pair in enumerate(get_round_chain_pairs(dfr)):
+        key = f'donor-sketch-{pair[1]}-{pair[0]}'
+        version = get_data_version(dfr.iloc[[i]])
+        snapshot = snapshots.load_snapshot(key, version, ['sketch'], max_age=float('inf'))
+        if snapshot is not None:
+            round_sketches[pair] = snapshot['sketch']['registers'].to_numpy(dtype=np.uint8)
+        else:
+            missing[pair] = (key, version)
+
+    if missing:
+        hashes = execute_query(read_query_file("queries/get_donor_hashes.sql"),
+                               params=round_chain_params(list(missing)), stream=True)
+        if 'donor_hash' not in hashes:
+            # A partial count would be cached and snapshotted with the program; fail its load instead
+            raise RuntimeError(f"Donor query failed for {len(missing)} rounds; cannot count unique donors")
+        hashes_by_round = {pair: group['donor_hash'].to_numpy() for pair, group in hashes.groupby(['round_id', 'chain_id'])}
+        for pair, (key, version) in missing.items():
+            registers = sketches.build(hashes_by_round.get(pair, np.empty(0, dtype=np.int64)))
+            round_sketches[pair] = registers
+            snapshots.save_snapshot(key, version, {'sketch': pd.DataFrame({'registers': registers})})
+    return round_sketches
+
+def count_unique_donors(dfr, exact=unique_donors_exact):
+    """
+    Number of distinct donors across the rounds in `dfr`, in any combination of rounds or programs.
+
+    By default the per-round sketches are merged in memory, which is close to exact for small
+    rounds and within about 0.8% (one standard error, `sketches.relative_error`) for large ones.
+    With `exact` the donors are counted in the database instead.
+    """
+    if exact:
+        unique_donors = get_unique_donors(get_round_chain_pairs(dfr))
+        return int(unique_donors['count'].iloc[0]) if not unique_donors.empty else 0
+    merged = sketches.merge(get_donor_sketches(dfr).values())
+    return int(round(sketches.estimate(merged)))
+
+def get_unique_donors_count_frame(dfr):
+    """count_unique_donors as the one-row 'count' frame the pages read."""
+    return pd.DataFrame({'count': [count_unique_donors(dfr)]})
 
 def get_hourly_contributions(round_chain_pairs):
-    round_ids = ', '.join([f"'{pair[0]}'" for pair in round_chain_pairs])
-    chain_ids = ', '.join([f"'{pair[1]}'" for pair in round_chain_pairs])
-
-    query = f"""
-    WITH round_chain_pairs AS (
-        SELECT 
-            unnest(ARRAY[{round_ids}]::text[]) AS round_id,
-            unnest(ARRAY[{chain_ids}]::text[]) AS chain_id
-    )
-    SELECT 
-        date_trunc('hour', timestamp) AS hour,
-        d.chain_id,
-        d.round_id,
-        token_address,
-        SUM(amount_in_usd) AS total_amount
-    FROM 
-        public.donations AS d
-    JOIN 
-        round_chain_pairs rcp 
-        ON d.round_id::text = rcp.round_id 
-        AND d.chain_id::text = rcp.chain_id
-    GROUP BY 1, 2, 3, 4
-    ORDER BY 1, 2, 3, 4
     """
+    Hourly contributions per round and token. Token symbols are left out: they depend on the
+    token table, which may still be the fallback, so add_token_codes attaches them where used.
+    """
+    dfh = execute_query(read_query_file("queries/get_hourly_contributions.sql"),
+                        params=round_chain_params(round_chain_pairs, since='-infinity'), database='grants', prepared=True)
+    return apply_schema(dfh, dataset_schemas['hourly_contributions'])
 
+def add_token_codes(dfh):
+    """
+    Attach the token symbol for each (chain_id, token_address) in the hourly contributions.
+
+    Anything built from the result should be cached under tokens_config_version(), read before this call.
+    """
     token_map = fetch_tokens_config()
     token_map = token_map[['chain_id', 'token_address', 'token_code']]
     token_map['token_address'] = token_map['token_address'].str.lower()
 
-    dfh = run_query(query, database='grants', is_file=False)
+    dfh = dfh.drop(columns='token_code', errors='ignore')  # snapshots written before codes were attached here
     dfh = pd.merge(dfh, token_map, how='left', left_on=['chain_id', 'token_address'], right_on=['chain_id', 'token_address'])
-    return dfh
+    return apply_schema(dfh, {'token_code': dataset_schemas['hourly_contributions']['token_code']})
+
 
+def refresh_incremental(name, round_chain_pairs, query_file, keys):
+    """
+    Keep a donation aggregate up to date by re-reading only recent donations.
+
+    The aggregate is split at an hour-aligned cutoff: everything before it is kept as a
+    folded base, everything after it is fetched again on each refresh. After each refresh
+    the cutoff moves up to `watermark_overlap` before the newest donation hour, so late
+    indexed or re-orged donations inside that window are still picked up. The whole
+    aggregate is rebuilt from scratch every `time_to_live` seconds to correct anything older.
+
+    :param name: Name of the aggregate, used with the pairs to key the stored state
+    :param query_file: SQL taking the round_chain_params plus %(since)s, returning rows per hour with
+        an 'hour' column, the `keys` columns, and a single value column to sum
+    :param keys: Columns the final aggregate is grouped by
+    :return: DataFrame aggregated by `keys`. If the query fails, the previous aggregate is returned
+        unchanged, or the failed query's empty frame when there is none yet.
+    """
+    with _incremental_lock:
+        state = _incremental_state.setdefault((name, tuple(round_chain_pairs)), {'lock': threading.Lock()})
+        _incremental_state.move_to_end((name, tuple(round_chain_pairs)))
+        # Bounded like the result cache: an evicted aggregate is rebuilt by its next full refresh
+        while len(_incremental_state) > incremental_state_limit:
+            _incremental_state.popitem(last=False)
+
+    with state['lock']:
+        full_refresh = 'base' not in state or time.time() - state['full_at'] > time_to_live
+        since = '-infinity' if full_refresh else state['cutoff']
+        rows = execute_query(read_query_file(query_file), params=round_chain_params(round_chain_pairs, since=since),
+                             database='grants', prepared=True)
+        value_columns = [c for c in rows.columns if c not in keys and c != 'hour']
+        if not value_columns:  # the query failed (see _execute_query); keep what we had
+            if 'recent' not in state:
+                return rows
+            return _sum_by(keys, state['value_column'], [state['base'], state['recent']])
+        if rows.empty and full_refresh:
+            return rows
+
+        value_column = value_columns[0]
+        base = rows.iloc[0:0] if full_refresh else state['base']
+
+        # Move the cutoff up to the overlap window before the newest donation hour
+        cutoff = state.get('cutoff')
+        if not rows.empty:
+            cutoff = max(cutoff or rows['hour'].min(), (rows['hour'].max() - watermark_overlap).floor('h'))
+        settled = rows[rows['hour'] < cutoff]
+        recent = rows[rows['hour'] >= cutoff]
+
+        state['base'] = _sum_by(keys, value_column, [base, settled])
+        state['cutoff'] = cutoff
+        state['recent'] = recent
+        state['value_column'] = value_column
+        if full_refresh:
+            state['full_at'] = time.time()
+        return _sum_by(keys, value_column, [state['base'], recent])
+
+def _sum_by(keys, value_column, frames):
+    return pd.concat(frames, ignore_index=True).groupby(keys, dropna=False, as_index=False)[value_column].sum()
+
+def live_rounds(dfr):
+    """Boolean Series: which rounds of `dfr` are currently accepting donations."""
+    now = pd.Timestamp.now(tz='UTC')
+    starts = pd.to_datetime(dfr['donations_start_time'], utc=True)
+    ends = pd.to_datetime(dfr['donations_end_time'], utc=True)
+    return (starts <= now) & (ends >= now)
+
+def is_live(dfr):
+    """Whether any round in `dfr` is currently accepting donations."""
+    return bool(live_rounds(dfr).any())
+
+@cache.cached(ttl=live_refresh_interval, max_stale=live_refresh_interval)
+def get_live_hourly_contributions(round_chain_pairs):
+    """Hourly contributions for a live round, refreshed incrementally every `live_refresh_interval` seconds."""
+    dfh = refresh_incremental('hourly', round_chain_pairs, "queries/get_hourly_contributions.sql",
+                              keys=['hour', 'chain_id', 'round_id', 'token_address'])
+    if dfh.empty:
+        return dfh
+    dfh = dfh.sort_values(['hour', 'chain_id', 'round_id', 'token_address'], ignore_index=True)
+    return apply_schema(dfh, dataset_schemas['hourly_contributions'])
+
+@cache.cached(ttl=live_refresh_interval, max_stale=live_refresh_interval)
+def get_live_voters_by_project(round_chain_pairs):
+    """Donor x project totals for a live round, refreshed incrementally every `live_refresh_interval` seconds."""
+    df = refresh_incremental('voters', round_chain_pairs, "queries/get_voters_by_project_hourly.sql",
+                             keys=['project_name', 'voter', 'voter_id', 'round_id', 'chain_id'])
+    if df.empty:
+        return df
+    df = df.sort_values('amountUSD', ascending=False, ignore_index=True)
+    return apply_schema(df, dataset_schemas['voters'])
+
+def load_voters_by_project(dfr):
+    """
+    Donor x project totals for the rounds in `dfr`, refreshed incrementally while any of them is live.
+
+    Settled rounds are sliced from a cached program-level frame when one holds them (see
+    slice_indexed_dataset), so clicking through a program's rounds costs no new queries.
+    """
+    round_chain_pairs = get_round_chain_pairs(dfr)
+    if is_live(dfr):
+        return get_live_voters_by_project(round_chain_pairs)
+    df = slice_indexed_dataset('voters', dfr)
+    if df is not None:
+        return df
+    data_version = get_data_version(dfr)
+    df = get_voters_by_project(round_chain_pairs, data_version)
+    if not df.empty:
+        index_dataset('voters', dfr, get_voters_by_project, round_chain_pairs, data_version)
+    return df
+
+def index_dataset(dataset, dfr, loader, *args):
+    """
+    Record that the cached `loader(*args)` holds the `dataset` rows of every round in `dfr`.
+
+    The frame must have round_id and chain_id columns as in get_round_chain_pairs. Entries are
+    tagged with each round's data version, so they stop matching once the round changes.
+    """
+    entries = {(dataset,) + pair: (version, loader, args)
+               for pair, version in zip(get_round_chain_pairs(dfr), get_round_versions(dfr))}
+    with _dataset_index_lock:
+        _dataset_index.update(entries)
+
+def slice_indexed_dataset(dataset, dfr):
+    """
+    Rows of `dataset` for the rounds in `dfr`, sliced from cached frames registered with index_dataset.
+
+    :return: DataFrame, or None when any round is not held, at its current data version, by a frame
+        that is still cached (the caller then queries the database)
+    """
+    sources = {}  # cache key -> (loader, args, pairs to take from its frame)
+    with _dataset_index_lock:
+        for pair, version in zip(get_round_chain_pairs(dfr), get_round_versions(dfr)):
+            entry = _dataset_index.get((dataset,) + pair)
+            if entry is None or entry[0] != version:
+                return None
+            _, loader, args = entry
+            sources.setdefault(cache.make_key(loader, args, {}), (loader, args, []))[2].append(pair)
+
+    frames = []
+    for loader, args, pairs in sources.values():
+        if not loader.ttl_remaining(*args):  # evicted or expired; don't reload a whole program for a slice
+            return None
+        df = loader(*args)
+        rounds = pd.MultiIndex.from_arrays([df['round_id'].astype(str), df['chain_id'].astype(str)])
+        frames.append(df[rounds.isin(pairs)])
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].reset_index(drop=True)
+
+def filter_network_votes(votes, min_donation, sample=False, max_connections=10000):
+    """Donor x project rows drawn on the Networks page: totals above `min_donation`, optionally sampled down to `max_connections`."""
+    votes = votes[votes['amountUSD'] > min_donation]
+    if sample and votes.shape[0] > max_connections:
+        votes = votes.sample(frac=max_connections / votes.shape[0], random_state=42)
+    return votes
+
+def live_voters_refreshed_at(dfr):
+    """When the live donor x project totals of `dfr` were last refreshed (None for settled rounds)."""
+    return get_live_voters_by_project.cached_at(get_round_chain_pairs(dfr)) if is_live(dfr) else None
+
+# A live round's layout is recomputed whenever its donor x project totals refresh, so new donors get placed
+@cache.cached(ttl=time_to_live, key=lambda dfr, min_donation, sample=False: (dfr, min_donation, sample, live_voters_refreshed_at(dfr)))
+def get_network_layout(dfr, min_donation, sample=False):
+    """
+    3D layout of the donor-project network of the round in `dfr`, as a frame of node, x, y, z.
+
+    Layouts are saved as snapshots keyed by round, filter and data version, so every session
+    and every restart reuses them until the round receives new donations. Live rounds are kept
+    in memory only, keyed by the last refresh of their donor x project totals.
 
+    :param dfr: Rounds frame filtered to a single round
+    :param min_donation: Minimum donor x project total, as on the page's slider
+    :param sample: Whether the network was sampled down to 10,000 connections
+    """
+    round_row = dfr.iloc[0]
+    round_key = f"{round_row['chain_id']}-{round_row['round_id']}"
+    key = f"layout-{round_key}-min{min_donation}" + ('-sampled' if sample else '')
+    data_version = get_data_version(dfr)
+    frames = snapshots.load_snapshot(key, data_version, ['layout'], max_age=float('inf'))
+    if frames is not None:
+        return frames['layout']
+
+    votes = filter_network_votes(load_voters_by_project(dfr), min_donation, sample)
+    node_names, src, dst = network.bipartite_edges(votes['voter_id'], votes['project_name'])
+    with _layout_lock:
+        previous = _layout_recent.get(round_key)
+    # Warm-start from this round's last layout so nearby filters settle quickly and look alike
+    initial = None
+    if previous is not None:
+        initial = network.warm_start_positions(
+            node_names, src, dst, dict(zip(previous['node'], previous[['x', 'y', 'z']].to_numpy())))
+    start = time.time()
+    coords = network.force_layout(src, dst, len(node_names), k=.09, iterations=50 if initial is None else 20, initial=initial)
+    print(f"Computed network layout {key} ({len(node_names)} nodes, {len(src)} edges) in {time.time() - start:.1f}s")
+    layout = pd.DataFrame({'node': node_names, 'x': coords[:, 0], 'y': coords[:, 1], 'z': coords[:, 2]})
+
+    with _layout_lock:
+        _layout_recent[round_key] = layout
+        _layout_recent.move_to_end(round_key)
+        while len(_layout_recent) > 8:
+            _layout_recent.popitem(last=False)
+    if not layout.empty and not is_live(dfr):  # live rounds change every minute; keep those in memory only
+        snapshots.save_snapshot(key, data_version, {'layout': layout})
+    return layout
+
+def schedule_network_layouts(dfr, min_donation=network_default_min_donation, top_n=network_prewarm_rounds):
+    """
+    Compute the layouts of the `top_n` rounds of `dfr` with the most donations in the background,
+    so the Networks page finds them ready. Each round and data version is only scheduled once.
 
+    The donor x project totals of the program's settled rounds are loaded first, in one query,
+    so these layouts and the rounds the user selects next are sliced from them.
+    """
+    settled = dfr[~live_rounds(dfr)]
+    if len(settled) > 1:
+        job = ('voters', tuple(get_round_chain_pairs(settled)), get_data_version(settled))
+        with _layout_lock:
+            if job not in _layout_scheduled:
+                _layout_scheduled.add(job)
+                _layout_executor.submit(_load_voters_in_background, settled)
+    for _, round_row in dfr.nlargest(top_n, 'votes').iterrows():
+        round_dfr = dfr[(dfr['chain_id'] == round_row['chain_id']) & (dfr['round_id'] == round_row['round_id'])]
+        job = (round_row['chain_id'], round_row['round_id'], min_donation, get_data_version(round_dfr))
+        with _layout_lock:
+            if job in _layout_scheduled:
+                continue
+            _layout_scheduled.add(job)
+        _layout_executor.submit(_compute_layout_in_background, round_dfr, min_donation)
+
+def _load_voters_in_background(dfr):
+    try:
+        load_voters_by_project(dfr)
+    except Exception as e:
+        print(f"Background voters load failed. Error: {e}")
+
+def _compute_layout_in_background(dfr, min_donation):
+    try:
+        get_network_layout(dfr, min_donation)
+    except Exception as e:
+        print(f"Background network layout failed. Error: {e}")
+
+def get_round_chain_pairs(dfr):
+    """List the (round_id, chain_id) pairs of the rounds in `dfr`, as used by the per-round queries."""
+    return [
+        (str(row['round_id']).lower(), str(row['chain_id'])) 
+        for _, row in dfr.iterrows()
+    ]
+
+@cache.cached(ttl=time_to_live, cache_empty=False)  # every page needs the rounds; retry a failed load right away
 def get_round_data():
-    return run_query(
-        "queries/get_rounds.sql",
-        database="grants",
-        is_file=True
-    )
+    return execute_query(read_query_file("queries/get_rounds.sql"), database="grants")
 
-@st.cache_resource(ttl=time_to_live)
+@cache.cached(ttl=time_to_live)
 def get_2024_stats():
-    return run_query(
-        "queries/get_2024_stats.sql",
-        database="grants",
-        is_file=True
-    )
+    return execute_query(read_query_file("queries/get_2024_stats.sql"), database="grants")
+
+def get_data_version(dfr):
+    """
+    Fingerprint the round totals in `dfr` so cached datasets can tell when donations have changed.
+
+    The indexer updates these counters as donations land, so the version changes
+    whenever any round in the frame receives new donations.
+    """
+    columns = [c for c in data_version_columns if c in dfr.columns]
+    rounds = dfr[columns].sort_values(['chain_id', 'round_id'])
+    hashes = pd.util.hash_pandas_object(rounds, index=False).values
+    return hashlib.sha1(hashes.tobytes()).hexdigest()[:16]
+
+def get_round_versions(dfr):
+    """Data version of each round of `dfr`, equal to get_data_version of that round alone."""
+    columns = [c for c in data_version_columns if c in dfr.columns]
+    hashes = pd.util.hash_pandas_object(dfr[columns], index=False).values
+    return [hashlib.sha1(h.tobytes()).hexdigest()[:16] for h in hashes]
 
 def add_round_options(dfr):
     dfr['options'] = dfr['round_name'] + ' | ' + dfr['type'].str.capitalize() + ' Round'
@@ -290,18 +730,97 @@ def add_round_options(dfr):
     return dfr
 
 
-@st.cache_resource(ttl=time_to_live)
+def run_in_parallel(tasks, max_workers=query_max_workers):
+    """
+    Run independent loaders concurrently and return their results.
+
+    :param tasks: Dict mapping a name to a tuple of (function, *args)
+    :param max_workers: Upper bound on the number of worker threads
+    :return: Dict mapping each name to the function's return value
+    """
+    ctx = get_script_run_ctx()
+
+    def attach_ctx():
+        # Let st.error and the Streamlit caches inside workers report to the calling session
+        add_script_run_ctx(threading.current_thread(), ctx)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks)), initializer=attach_ctx) as executor:
+        futures = {name: executor.submit(func, *args) for name, (func, *args) in tasks.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def _query_summary_stats_component(name):
+    return execute_query(read_query_file(summary_stats_components[name][0]))
+
+# One cached loader per component, each with the component's own TTL; a failed query isn't kept around for hours
+_summary_stats_loaders = {name: cache.cached(ttl=ttl, cache_empty=False)(_query_summary_stats_component)
+                          for name, (_, ttl) in summary_stats_components.items()}
+
+def get_summary_stats_component(name):
+    """One-row frame of a lifetime stats component, cached for that component's own TTL."""
+    return _summary_stats_loaders[name](name)
+
+def get_summary_stats():
+    """
+    Lifetime totals across all programs as a one-row frame.
+
+    The components in `summary_stats_components` are queried concurrently and cached
+    separately, so a refresh of the donation totals doesn't recompute the payout totals.
+    """
+    parts = run_in_parallel({name: (get_summary_stats_component, name) for name in summary_stats_components})
+    row = {'bounties_distributed': bounties_distributed_usd}
+    for df in parts.values():
+        if not df.empty:
+            row.update(df.iloc[0].to_dict())
+    stats = pd.DataFrame([row])
+
+    usd_columns = ['crowdfunded_usd', 'matchingfunds', 'bounties_distributed', 'direct_grants_payouts', 'other_gmv', 'maci_crowdfunding']
+    round_columns = ['matching_rounds', 'direct_grant_rounds', 'allo_rounds', 'maci_rounds']
+    for column in usd_columns + round_columns:
+        if column not in stats:
+            stats[column] = np.nan
+    # Like the SQL sums, a total is missing if any of its parts is
+    stats['total_usd'] = stats[usd_columns].astype(float).sum(axis=1, min_count=len(usd_columns))
+    stats['total_rounds'] = stats[round_columns].astype(float).sum(axis=1, min_count=len(round_columns))
+    stats['total_grantees'] = stats.get('unique_grantees', np.nan)
+    return stats
+
+def program_rounds(program, dfr):
+    """The rounds of `program` in the all-programs rounds frame `dfr`."""
+    return dfr[dfr['program'] == program]
+
+# Keyed by the program's own data version, so donations to other programs' rounds don't re-key it
+@cache.cached(ttl=time_to_live, key=lambda program, dfr: (program, get_data_version(program_rounds(program, dfr))))
+def get_program_data(program, dfr):
+    """
+    Load the datasets of a program: (dfp, dfr, unique_donors, hourly_contributions).
+
+    :param dfr: Rounds of all programs, as returned by get_round_data
+    """
+    dfr = program_rounds(program, dfr)
+    round_chain_pairs = get_round_chain_pairs(dfr)
+    # Serve from the on-disk snapshot when one exists for the current data version
+    data_version = get_data_version(dfr)
+    frames = snapshots.load_snapshot(program, data_version, ['dfp', 'unique_donors', 'hourly_contributions'])
+    if frames is None:
+        # The queries are independent, so run them side by side
+        frames = run_in_parallel({
+            'unique_donors': (get_unique_donors_count_frame, dfr),
+            'hourly_contributions': (get_hourly_contributions, round_chain_pairs),
+            'dfp': (get_projects, round_chain_pairs),
+        })
+        if not any(df.empty for df in frames.values()):  # don't persist a failed load
+            snapshots.save_snapshot(program, data_version, frames)
+    else:
+        frames = {name: apply_schema(df, dataset_schemas.get(name, {})) for name, df in frames.items()}
+    print(f"Loaded {program} dataset:\n{memory_report(frames).to_string(index=False)}")
+    return frames['dfp'], add_round_options(dfr), frames['unique_donors'], frames['hourly_contributions']
+
 def load_round_data(program, dfr):
-    dfr = dfr[dfr['program'] == program]
-    # Create list of (round_id, chain_id) pairs
-    round_chain_pairs = [
-        (str(row['round_id']).lower(), str(row['chain_id'])) 
-        for _, row in dfr.iterrows()
-    ]
-    unique_donors = get_unique_donors(round_chain_pairs)
-    hourly_contributions = get_hourly_contributions(round_chain_pairs)
-    dfp = get_projects(round_chain_pairs)
-    dfr = add_round_options(dfr)
+    """Load a program's datasets and keep them in the session for the other pages."""
+    dfp, dfr_program, unique_donors, hourly_contributions = get_program_data(program, dfr)
+    st.session_state.data_as_of = get_program_data.cached_at(program, dfr)
+    dfr = dfr_program
     st.session_state.dfp = dfp
     st.session_state.dfr = dfr
     st.session_state.unique_donors = unique_donors
@@ -310,6 +829,65 @@ def load_round_data(program, dfr):
 
     return dfp, dfr, unique_donors, hourly_contributions
 
+@st.cache_data(ttl=3600)
+def generate_round_summary(hourly_contributions, dfp, dfr):
+    """
+    Build the per-round table shown on the Home page: match multiple, round URL,
+    hourly contribution series, project count, matching pool, donors and total donated.
+    """
+    # Initialize round summary with basic metrics
+    round_summary = dfr[['round_name', 'amountUSD', 'uniqueContributors', 'match_amount_in_usd', 'chain_id', 'round_id']]
+    round_summary = round_summary.rename(columns={
+        'amountUSD': 'total_donated',
+        'uniqueContributors': 'unique_donors',
+        'match_amount_in_usd': 'matching_pool'
+    })
+
+    # Get project count per round
+    project_count = dfp.groupby('round_name', observed=True)['projectId'].nunique().reset_index()
+    project_count.columns = ['round_name', 'project_count']
+
+    # Round matching pool to nearest thousand
+    round_summary['matching_pool'] = round_summary['matching_pool'].round(-3)
+
+    # Merge project count with round summary
+    round_summary = pd.merge(round_summary, project_count, on='round_name')
+
+    # Calculate matching ratio (rounds without donations are compared against themselves)
+    denominator = round_summary['total_donated'].where(round_summary['total_donated'] != 0, round_summary['matching_pool'])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = round_summary['matching_pool'].to_numpy(dtype='float64') / denominator.to_numpy(dtype='float64')
+    round_summary['crowdfunding_to_matching_ratio'] = [f"{r:.1f}x" for r in ratio]
+
+    # One hourly series per round: a single grouped pass instead of a mask per row
+    hourly_data = hourly_contributions.groupby(['chain_id', 'round_id', 'hour'], observed=True)['total_amount'].sum().reset_index()
+    hourly_series = hourly_data.groupby(['chain_id', 'round_id'], observed=True, sort=False)['total_amount'].agg(list).to_dict()
+    round_summary['hourly_contributions'] = [
+        hourly_series.get(key, []) for key in zip(round_summary['chain_id'], round_summary['round_id'])
+    ]
+
+    # Create round URLs
+    round_summary['round_url'] = (
+        'https://explorer.gitcoin.co/#/round/'
+        + round_summary['chain_id'].astype(str) + '/' + round_summary['round_id'].astype(str)
+    )
+
+    # Sort by total donated
+    round_summary = round_summary.sort_values('total_donated', ascending=False)
+    # Select and order final columns
+    round_summary = round_summary[[
+        'round_name',
+        'crowdfunding_to_matching_ratio',
+        'round_url',
+        'hourly_contributions',
+        'project_count',
+        'matching_pool',
+        'unique_donors',
+        'total_donated',
+    ]]
+
+    return round_summary
+
 def get_time_left(target_time):
     now = datetime.now(timezone.utc)
     time_diff = target_time - now
@@ -319,3 +897,8 @@ def get_time_left(target_time):
         return f"0 days   0 hours   0 minutes"
     return f"{time_diff.days} days   {hours} hours   {minutes} minutes"
 
+
+
+perf.register_stats('Result cache', cache.result_cache.stats)
+perf.register_stats('Query coalescing', lambda: {'queries': query_flights.stats(), 'cached loaders': cache.cache_flights.stats()})
+perf.register_stats('Connection pools', db.pool_stats)
@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+
+import pandas as pd
+
+import perf
+import tokens
+import utils
+
+
+warmup_enabled = os.environ.get('CACHE_WARMUP', '1').lower() not in ('0', 'false')
+warmup_check_interval = 30  # seconds between passes over the programs
+warmup_margin = 120  # re-warm entries expiring within the next 2 minutes
+warmup_token_wait = 60  # seconds to wait for the token table before warming anyway
+
+_status = {}  # program -> {'state', 'warmed_at', 'duration'}
+_status_lock = threading.Lock()
+_thread = None
+_start_lock = threading.Lock()
+
+
+def program_priority(dfr):
+    """
+    Programs of `dfr` in the order to warm them: programs with a live round first,
+    then by their most recent donation window.
+    """
+    now = pd.Timestamp.now(tz='UTC')
+    rounds = pd.DataFrame({
+        'program': dfr['program'],
+        'start': pd.to_datetime(dfr['donations_start_time'], utc=True),
+        'end': pd.to_datetime(dfr['donations_end_time'], utc=True),
+    })
+    rounds['live'] = (rounds['start'] <= now) & (rounds['end'] >= now)
+    programs = rounds.groupby('program').agg(live=('live', 'any'), end=('end', 'max'))
+    programs = programs.sort_values(['live', 'end'], ascending=False, na_position='last')
+    return list(programs.index)
+
+
+def _set_status(program, **fields):
+    with _status_lock:
+        _status.setdefault(program, {'state': 'cold', 'warmed_at': None, 'duration': None}).update(fields)
+
+
+def warm_once():
+    """Load every program whose cached datasets are missing or about to expire, most important first."""
+    if utils.get_round_data.ttl_remaining() is None or utils.get_round_data.ttl_remaining() < warmup_margin:
+        utils.get_round_data.refresh()
+    dfr = utils.get_round_data()
+    if dfr.empty:
+        return
+    for program in program_priority(dfr):
+        remaining = utils.get_program_data.ttl_remaining(program, dfr)
+        if remaining is not None and remaining >= warmup_margin:
+            continue
+        _set_status(program, state='warming')
+        start = time.time()
+        try:
+            utils.get_program_data.refresh(program, dfr)
+        except Exception as e:
+            print(f"Cache warm-up failed for {program}. Error: {e}")
+            _set_status(program, state='failed')
+            continue
+        _set_status(program, state='warm', warmed_at=time.time(), duration=time.time() - start)
+        print(f"Warmed {program} cache in {time.time() - start:.1f}s")
+
+
+def _run():
+    # On a fresh deploy the token registry only has its fallback until the first fetch finishes;
+    # let that happen before loading every program, so nothing is warmed against the fallback
+    if not tokens.registry.wait_until_settled(warmup_token_wait):
+        print(f"Token table still not fetched after {warmup_token_wait}s; warming the caches anyway")
+    while True:
+        try:
+            warm_once()
+        except Exception as e:
+            print(f"Cache warm-up pass failed. Error: {e}")
+        time.sleep(warmup_check_interval)
+
+
+def start():
+    """Start the warm-up thread, once per server process. Safe to call on every page run."""
+    global _thread
+    if not warmup_enabled:
+        return
+    with _start_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_run, name='cache-warmup', daemon=True)
+            _thread.start()
+
+
+def status():
+    """
+    Warm/cold state of each program's cached datasets.
+
+    :return: DataFrame of program, state ('warm', 'cold', 'warming' or 'failed'),
+        warmed_at, load duration in seconds and seconds until the cached entry expires
+    """
+    dfr = utils.get_round_data()
+    with _status_lock:
+        known = {program: dict(fields) for program, fields in _status.items()}
+    rows = []
+    for program in (program_priority(dfr) if not dfr.empty else list(known)):
+        fields = known.get(program, {'state': 'cold', 'warmed_at': None, 'duration': None})
+        expires_in = utils.get_program_data.ttl_remaining(program, dfr) if not dfr.empty else None
+        if fields['state'] not in ('warming', 'failed'):
+            # Sessions load programs too, and entries can expire or be evicted after warming
+            fields['state'] = 'warm' if expires_in is not None else 'cold'
+        rows.append({'program': program, **fields, 'expires_in': expires_in})
+    df = pd.DataFrame(rows, columns=['program', 'state', 'warmed_at', 'duration', 'expires_in'])
+    df['warmed_at'] = pd.to_datetime(df['warmed_at'], unit='s', utc=True)
+    return df
+
+
+perf.register_stats('Cache warm-up', status)